@@ -0,0 +1,165 @@
+"""
+_patron_kernels.py
+Array kernels for moving patrons, shared by the park's batch step.
+
+Every function takes and returns plain NumPy arrays (one entry per patron)
+and draws no random numbers itself, so each call is a fixed sequence of
+vectorized operations over all patrons at once.
+"""
+
+import numpy as np
+
+
+# Directions are quantized to ANGLE_STEPS buckets around the circle, so a
+# random heading costs a table lookup instead of a sin/cos pair
+ANGLE_STEPS = 1024
+_ANGLES = np.linspace(0, 2 * np.pi, ANGLE_STEPS, endpoint=False)
+COS_TABLE = np.cos(_ANGLES).astype(np.float32)
+SIN_TABLE = np.sin(_ANGLES).astype(np.float32)
+
+
+def angle_index(angle):
+    """
+    Quantize angles (radians, any range) to indices into the trig tables.
+    
+    Returns:
+        np.ndarray: Integer indices in [0, ANGLE_STEPS)
+    """
+    steps = np.rint(np.asarray(angle) * (ANGLE_STEPS / (2 * np.pi)))
+    return steps.astype(np.int64) % ANGLE_STEPS
+
+
+def roam_step(x, y, speed, target_x, target_y, has_target, wander, random_angle):
+    """
+    Take one step for each roaming patron.
+    
+    Patrons with a target walk toward it, with their heading rotated by
+    the wander angle; the others walk in their random direction.
+    
+    Parameters:
+        x, y (np.ndarray): Current positions
+        speed (np.ndarray): Move speed of each patron
+        target_x, target_y (np.ndarray): Target ride positions
+        has_target (np.ndarray): Whether each patron is heading for a ride
+        wander (np.ndarray): Table index of the angle added to the heading
+        random_angle (np.ndarray): Table index of the direction used when
+            there is no target
+        
+    Returns:
+        tuple: New (x, y) arrays
+    """
+    dx = target_x - x
+    dy = target_y - y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distance = np.hypot(dx, dy)
+        ux = dx / distance
+        uy = dy / distance
+    
+    cos_w = COS_TABLE[wander]
+    sin_w = SIN_TABLE[wander]
+    dir_x = np.where(has_target, ux * cos_w - uy * sin_w, COS_TABLE[random_angle])
+    dir_y = np.where(has_target, ux * sin_w + uy * cos_w, SIN_TABLE[random_angle])
+    return x + speed * dir_x, y + speed * dir_y
+
+
+def step_in_direction(x, y, speed, angle):
+    """
+    Move each patron one step along its direction.
+    
+    Parameters:
+        angle (np.ndarray): Table index of each patron's direction
+    
+    Returns:
+        tuple: New (x, y) arrays
+    """
+    return x + speed * COS_TABLE[angle], y + speed * SIN_TABLE[angle]
+
+
+class BoxGrid:
+    """
+    Uniform grid over the park where each cell lists the boxes overlapping it.
+    
+    A point only needs testing against the boxes of its own cell, so the
+    cost no longer grows with the number of obstacles in the park.
+    """
+    
+    def __init__(self, boxes, width, height, cell_size):
+        """
+        Bucket boxes into grid cells.
+        
+        Parameters:
+            boxes (np.ndarray): Boxes as rows of (x_min, y_min, x_max, y_max)
+            width, height (float): Extent of the grid; points and boxes
+                outside it fall into the edge cells
+            cell_size (float): Side length of a cell
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.cell_size = cell_size
+        self.cols = int(width // cell_size) + 1
+        self.rows = int(height // cell_size) + 1
+        
+        cells = [[] for _ in range(self.rows * self.cols)]
+        for b, (x_min, y_min, x_max, y_max) in enumerate(self.boxes):
+            c0, c1 = self._cell_range(x_min, x_max, self.cols)
+            r0, r1 = self._cell_range(y_min, y_max, self.rows)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    cells[r * self.cols + c].append(b)
+        
+        self._cells = cells
+        self._box_list = self.boxes.tolist()
+        
+        # Pad every cell to the same length with -1 so lookups stay vectorized
+        depth = max(1, max(len(cell) for cell in cells))
+        self.cell_boxes = np.full((len(cells), depth), -1, dtype=np.int64)
+        for i, cell in enumerate(cells):
+            self.cell_boxes[i, :len(cell)] = cell
+    
+    def _cell_range(self, lo, hi, count):
+        """Get the first and last cell index covering [lo, hi] on one axis."""
+        first = min(max(int(lo // self.cell_size), 0), count - 1)
+        last = min(max(int(hi // self.cell_size), 0), count - 1)
+        return first, last
+    
+    def outside(self, xs, ys):
+        """
+        Check which points lie outside every box.
+        
+        Parameters:
+            xs, ys (np.ndarray): Point coordinates, shape (n,)
+            
+        Returns:
+            np.ndarray: Boolean mask, True where a point is in no box
+        """
+        if len(self.boxes) == 0:
+            return np.ones(len(xs), dtype=bool)
+        
+        col = np.clip((xs // self.cell_size).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((ys // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        candidates = self.cell_boxes[row * self.cols + col]
+        boxes = self.boxes[np.maximum(candidates, 0)]
+        xs = xs[:, None]
+        ys = ys[:, None]
+        inside = ((candidates >= 0) &
+                  (boxes[..., 0] <= xs) & (xs <= boxes[..., 2]) &
+                  (boxes[..., 1] <= ys) & (ys <= boxes[..., 3]))
+        return ~inside.any(axis=1)
+    
+    def point_outside(self, x, y):
+        """
+        Check a single point against the boxes of its cell.
+        
+        Plain-Python counterpart of outside() for one point, which avoids
+        building arrays for a lone query.
+        
+        Returns:
+            bool: True if the point is in no box
+        """
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        boxes = self._box_list
+        for b in self._cells[row * self.cols + col]:
+            x_min, y_min, x_max, y_max = boxes[b]
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return False
+        return True
@@ -5,18 +5,47 @@ Enhanced rides with FIXED title positioning and better visibility.
 
 import math
 import random
+import numpy as np
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, Circle, Wedge
 from abc import ABC, abstractmethod
 from collections import deque
 from config import RideState, PatronState, DEFAULT_LOADING_TIME, DEFAULT_UNLOAD_TIME
+from config import RIDE_OVERLAP_BUFFER
+
+
+def _unit_directions(count):
+    """Unit vectors of count evenly spaced directions, starting at angle 0."""
+    return [(math.cos(2 * math.pi * i / count), math.sin(2 * math.pi * i / count))
+            for i in range(count)]
+
+
+def _rotate(directions, angle):
+    """Rotate unit vectors by an angle with a single sin/cos pair."""
+    c = math.cos(angle)
+    s = math.sin(angle)
+    return [(c * dx - s * dy, s * dx + c * dy) for dx, dy in directions]
+
+
+# Spoke, arm and spin-line directions at angle 0, rotated each frame
+_GONDOLA_DIRECTIONS = _unit_directions(8)
+_ARM_DIRECTIONS = _unit_directions(6)
+_SPIN_DIRECTIONS = _unit_directions(4)
 
 
 class Ride(ABC):
     """Abstract base class for all theme park rides."""
     
+    # Subclasses list only the animation state they add
+    __slots__ = ('id', 'park', 'name', 'x', 'y', 'width', 'height', 'capacity',
+                 'duration', 'state', 'queue', 'queue_front', 'riders', 'timer',
+                 'loading_time', 'unload_time', '_state_fn',
+                 'total_riders_served', 'total_cycles', 'popularity_score')
+    
     def __init__(self, name, x, y, width, height, capacity, duration):
         """Initialize a ride."""
+        self.id = None  # Index in park.rides, set by Park.add_ride
+        self.park = None  # Park whose total_queue_len this ride keeps current
         self.name = name
         self.x = x
         self.y = y
@@ -27,11 +56,16 @@ class Ride(ABC):
         
         self.state = RideState.IDLE
         self.queue = deque()
+        self.queue_front = 0  # Ticket number of the patron at the front
         self.riders = []
         self.timer = 0
         self.loading_time = DEFAULT_LOADING_TIME
         self.unload_time = DEFAULT_UNLOAD_TIME
         
+        # Tick handler for each state, indexed by the RideState value
+        self._state_fn = (self._tick_idle, self._tick_loading,
+                          self._tick_running, self._tick_unloading)
+        
         # Statistics
         self.total_riders_served = 0
         self.total_cycles = 0
@@ -51,13 +85,16 @@ class Ride(ABC):
         box2 = other_ride.get_bounding_box()
         
         # Add buffer zone
-        buffer = 5
+        buffer = RIDE_OVERLAP_BUFFER
         return not (box1[2] + buffer < box2[0] or box1[0] > box2[2] + buffer or 
                    box1[3] + buffer < box2[1] or box1[1] > box2[3] + buffer)
     
     def add_to_queue(self, patron):
         """Add a patron to the ride's queue."""
+        patron.queue_ticket = self.queue_front + len(self.queue)
         self.queue.append(patron)
+        if self.park is not None:
+            self.park.total_queue_len += 1
         patron.state = PatronState.QUEUING
         patron.target_ride = self
         self.popularity_score += 1
@@ -77,75 +114,142 @@ class Ride(ABC):
         patron.x = box[0] + col * queue_spacing + queue_spacing/2 - row_offset
         patron.y = box[1] - 3 - row * 1.5
     
+    def queue_position(self, patron):
+        """
+        Get a queuing patron's place in line (0 is the front).
+        
+        Each patron keeps the ticket number it got on joining, so this is
+        O(1) instead of searching the queue.
+        
+        Parameters:
+            patron (Patron): A patron in this ride's queue
+            
+        Returns:
+            int: Number of patrons ahead of them
+        """
+        return patron.queue_ticket - self.queue_front
+    
+    def remove_from_queue(self, patron):
+        """
+        Take a patron out of the queue, moving everyone behind them up.
+        
+        Parameters:
+            patron (Patron): A patron in this ride's queue
+        """
+        position = self.queue_position(patron)
+        del self.queue[position]
+        patron.queue_ticket = None
+        if self.park is not None:
+            self.park.total_queue_len -= 1
+        for i in range(position, len(self.queue)):
+            self.queue[i].queue_ticket -= 1
+    
     def load_patrons(self):
         """Load patrons from queue onto the ride."""
-        while len(self.riders) < self.capacity and len(self.queue) > 0:
-            patron = self.queue.popleft()
-            self.riders.append(patron)
-            patron.state = PatronState.RIDING
-            
-            # Position rider on the ride
-            patron.x = self.x
-            patron.y = self.y
+        count = min(self.capacity - len(self.riders), len(self.queue))
+        if count <= 0:
+            return
+        
+        queue = self.queue
+        boarding = [queue.popleft() for _ in range(count)]
+        self.queue_front += count
+        if self.park is not None:
+            self.park.total_queue_len -= count
+        self.riders.extend(boarding)
+        
+        # Board and position riders; those in a park are set as one
+        # assignment per column
+        park = None
+        rows = []
+        for patron in boarding:
+            patron.queue_ticket = None
+            if patron.park is None:
+                patron.state = PatronState.RIDING
+                patron.x = self.x
+                patron.y = self.y
+            else:
+                park = patron.park
+                rows.append(patron.idx)
+        if rows:
+            park.patron_state[rows] = PatronState.RIDING
+            park.patron_x[rows] = self.x
+            park.patron_y[rows] = self.y
     
     def unload_patrons(self):
         """Unload all patrons from the ride."""
         if len(self.riders) > 0:
             print(f"  🎢 {self.name} unloading {len(self.riders)} patrons")
         
-        self.total_riders_served += len(self.riders)
-        
-        for patron in self.riders:
+        count = len(self.riders)
+        self.total_riders_served += count
+        
+        # Draw every rider's pause and scatter position in one go, from the
+        # park's generator or, for a ride on its own, one seeded from the
+        # random module
+        if self.park is not None:
+            rng = self.park.rng
+        else:
+            rng = np.random.default_rng(random.getrandbits(64))
+        timers = rng.integers(2, 6, count).tolist()
+        angles = rng.uniform(0, 2 * math.pi, count)
+        radii = rng.uniform(self.width/2 + 3, self.width/2 + 6, count)
+        xs = (self.x + radii * np.cos(angles)).tolist()
+        ys = (self.y + radii * np.sin(angles)).tolist()
+        
+        for patron, timer, x, y in zip(self.riders, timers, xs, ys):
             patron.state = PatronState.ROAMING
             patron.mark_ride_completed(self)  # FIXED: Mark ride as completed
-            patron.immobile_timer = random.randint(2, 5)
+            patron.immobile_timer = timer
             
             # Scatter them around the exit
-            box = self.get_bounding_box()
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.uniform(self.width/2 + 3, self.width/2 + 6)
-            patron.x = self.x + radius * math.cos(angle)
-            patron.y = self.y + radius * math.sin(angle)
+            patron.x = x
+            patron.y = y
             
         self.riders.clear()
     
     def step_change(self):
         """Update the ride's state machine."""
-        if self.state == RideState.IDLE:
-            if len(self.queue) > 0:
-                self.state = RideState.LOADING
-                self.timer = self.loading_time
-                print(f"  🎢 {self.name} starting to LOAD (queue: {len(self.queue)})")
-                
-        elif self.state == RideState.LOADING:
-            self.load_patrons()
-            self.timer -= 1
-            
-            if self.timer <= 0:
-                if len(self.riders) > 0:
-                    self.state = RideState.RUNNING
-                    self.timer = self.duration
-                    print(f"  🎢 {self.name} RUNNING with {len(self.riders)} riders")
-                else:
-                    self.state = RideState.IDLE
-                    
-        elif self.state == RideState.RUNNING:
-            self.update_movement()
-            self.timer -= 1
-            
-            if self.timer <= 0:
-                self.state = RideState.UNLOADING
-                self.timer = self.unload_time
-                self.total_cycles += 1
-                print(f"  🎢 {self.name} starting to UNLOAD")
-                
-        elif self.state == RideState.UNLOADING:
-            self.timer -= 1
-            
-            if self.timer <= 0:
-                self.unload_patrons()
+        self._state_fn[self.state]()
+    
+    def _tick_idle(self):
+        """Start loading once patrons are waiting."""
+        if len(self.queue) > 0:
+            self.state = RideState.LOADING
+            self.timer = self.loading_time
+            print(f"  🎢 {self.name} starting to LOAD (queue: {len(self.queue)})")
+    
+    def _tick_loading(self):
+        """Board patrons until the loading time is up."""
+        self.load_patrons()
+        self.timer -= 1
+        
+        if self.timer <= 0:
+            if len(self.riders) > 0:
+                self.state = RideState.RUNNING
+                self.timer = self.duration
+                print(f"  🎢 {self.name} RUNNING with {len(self.riders)} riders")
+            else:
                 self.state = RideState.IDLE
     
+    def _tick_running(self):
+        """Animate the ride until its duration is up."""
+        self.update_movement()
+        self.timer -= 1
+        
+        if self.timer <= 0:
+            self.state = RideState.UNLOADING
+            self.timer = self.unload_time
+            self.total_cycles += 1
+            print(f"  🎢 {self.name} starting to UNLOAD")
+    
+    def _tick_unloading(self):
+        """Let riders off once the unload time is up."""
+        self.timer -= 1
+        
+        if self.timer <= 0:
+            self.unload_patrons()
+            self.state = RideState.IDLE
+    
     def get_state_color(self):
         """Get color based on ride state."""
         colors = {
@@ -170,6 +274,8 @@ class Ride(ABC):
 class PirateShip(Ride):
     """A spectacular pirate ship ride."""
     
+    __slots__ = ('angle', 'swing_speed', 'max_angle', 'direction')
+    
     def __init__(self, name, x, y, capacity=10, duration=20):
         super().__init__(name, x, y, width=12, height=10, capacity=capacity, duration=duration)
         self.angle = 0
@@ -269,6 +375,8 @@ class PirateShip(Ride):
 class FerrisWheel(Ride):
     """A majestic Ferris wheel."""
     
+    __slots__ = ('angle', 'rotation_speed', 'radius')
+    
     def __init__(self, name, x, y, capacity=16, duration=30):
         super().__init__(name, x, y, width=14, height=14, capacity=capacity, duration=duration)
         self.angle = 0
@@ -312,19 +420,16 @@ class FerrisWheel(Ride):
         ax.add_patch(inner_ring)
         
         # Spokes and gondolas
-        num_gondolas = 8
-        for i in range(num_gondolas):
-            spoke_angle = self.angle + (2 * math.pi * i / num_gondolas)
-            
+        for cos_a, sin_a in _rotate(_GONDOLA_DIRECTIONS, self.angle):
             # Spoke from center to outer rim
-            spoke_x = self.x + self.radius * math.cos(spoke_angle)
-            spoke_y = self.y + self.radius * math.sin(spoke_angle)
+            spoke_x = self.x + self.radius * cos_a
+            spoke_y = self.y + self.radius * sin_a
             ax.plot([self.x, spoke_x], [self.y, spoke_y], 
                    color='steelblue', linewidth=3, alpha=0.7, zorder=3)
             
             # Gondola position
-            gondola_x = self.x + self.radius * 0.95 * math.cos(spoke_angle)
-            gondola_y = self.y + self.radius * 0.95 * math.sin(spoke_angle)
+            gondola_x = self.x + self.radius * 0.95 * cos_a
+            gondola_y = self.y + self.radius * 0.95 * sin_a
             
             # Gondola appearance based on state
             if self.state == RideState.RUNNING:
@@ -373,6 +478,9 @@ class FerrisWheel(Ride):
 class SpiderRide(Ride):
     """An thrilling spider/octopus ride."""
     
+    __slots__ = ('angle', 'rotation_speed', 'arm_length', 'arm_extension',
+                 'extension_speed', 'extending')
+    
     def __init__(self, name, x, y, capacity=12, duration=25):
         super().__init__(name, x, y, width=16, height=16, capacity=capacity, duration=duration)
         self.angle = 0
@@ -417,21 +525,19 @@ class SpiderRide(Ride):
         ax.add_patch(glow)
         
         # Arms with gradient
-        num_arms = 6
-        for i in range(num_arms):
-            arm_angle = self.angle + (2 * math.pi * i / num_arms)
-            current_length = self.arm_length * (0.6 + 0.4 * self.arm_extension)
-            
+        current_length = self.arm_length * (0.6 + 0.4 * self.arm_extension)
+        spin_directions = _rotate(_SPIN_DIRECTIONS, self.angle * 3)
+        for cos_a, sin_a in _rotate(_ARM_DIRECTIONS, self.angle):
             # Draw arm with segments for 3D effect
             segments = 8
             for seg in range(segments):
                 seg_ratio = seg / segments
                 next_ratio = (seg + 1) / segments
                 
-                x1 = self.x + current_length * seg_ratio * math.cos(arm_angle)
-                y1 = self.y + current_length * seg_ratio * math.sin(arm_angle)
-                x2 = self.x + current_length * next_ratio * math.cos(arm_angle)
-                y2 = self.y + current_length * next_ratio * math.sin(arm_angle)
+                x1 = self.x + current_length * seg_ratio * cos_a
+                y1 = self.y + current_length * seg_ratio * sin_a
+                x2 = self.x + current_length * next_ratio * cos_a
+                y2 = self.y + current_length * next_ratio * sin_a
                 
                 # Varying width and color
                 width = 5 - seg_ratio * 2.5
@@ -441,8 +547,8 @@ class SpiderRide(Ride):
                        solid_capstyle='round', zorder=3)
             
             # End car with rotation indicator
-            arm_x = self.x + current_length * math.cos(arm_angle)
-            arm_y = self.y + current_length * math.sin(arm_angle)
+            arm_x = self.x + current_length * cos_a
+            arm_y = self.y + current_length * sin_a
             
             # Car color based on state
             if self.state == RideState.RUNNING:
@@ -462,11 +568,9 @@ class SpiderRide(Ride):
             
             # Spin lines for effect
             if self.state == RideState.RUNNING:
-                spin_angle = self.angle * 3
-                for j in range(4):
-                    line_angle = spin_angle + (math.pi / 2 * j)
-                    lx = arm_x + 0.7 * math.cos(line_angle)
-                    ly = arm_y + 0.7 * math.sin(line_angle)
+                for cos_s, sin_s in spin_directions:
+                    lx = arm_x + 0.7 * cos_s
+                    ly = arm_y + 0.7 * sin_s
                     ax.plot([arm_x, lx], [arm_y, ly], 
                            color='yellow', linewidth=2, alpha=0.8, zorder=6)
         
@@ -502,6 +606,8 @@ class SpiderRide(Ride):
 class RollerCoaster(Ride):
     """Roller coaster with train movement along track"""
     
+    __slots__ = ('train_position', 'speed')
+    
     def __init__(self, name, x, y, capacity=8, duration=15):
         super().__init__(name, x, y, width=18, height=8, 
                          capacity=capacity, duration=duration)
@@ -3,23 +3,23 @@ config.py
 Perfect configuration for 280x200 park with NO overlaps!
 """
 
-from enum import Enum
+from enum import IntEnum
 
 
-class RideState(Enum):
-    """States that a ride can be in"""
-    IDLE = "idle"
-    LOADING = "loading"
-    RUNNING = "running"
-    UNLOADING = "unloading"
+class RideState(IntEnum):
+    """States that a ride can be in (values index Ride's tick table)"""
+    IDLE = 0
+    LOADING = 1
+    RUNNING = 2
+    UNLOADING = 3
 
 
-class PatronState(Enum):
-    """States that a patron can be in"""
-    ROAMING = "roaming"
-    QUEUING = "queuing"
-    RIDING = "riding"
-    EXITING = "exiting"
+class PatronState(IntEnum):
+    """States that a patron can be in (values are the park's array codes)"""
+    ROAMING = 0
+    QUEUING = 1
+    RIDING = 2
+    EXITING = 3
 
 
 # PERFECT SPACING PARK - Works great with 1-6 rides
@@ -27,12 +27,16 @@ DEFAULT_PARK_WIDTH = 280
 DEFAULT_PARK_HEIGHT = 200
 DEFAULT_SPAWN_RATE = 0.22
 DEFAULT_MAX_TIMESTEPS = 700
+SPAWN_GAP_BATCH = 64  # Arrival gaps drawn per RNG call
+SLOWDOWN_BATCH_TICKS = 1024  # Timesteps of ride slowdown rolls drawn per RNG call
 DEFAULT_PATRON_MOVE_SPEED = 0.75
 DEFAULT_PATRON_IMMOBILE_TIME = 5
+OBSTACLE_CELL_SIZE = 16  # Cell size of the grid used for patron collision checks
 
 # Ride defaults
 DEFAULT_LOADING_TIME = 3
 DEFAULT_UNLOAD_TIME = 2
+RIDE_OVERLAP_BUFFER = 5  # Minimum gap kept between ride bounding boxes
 
 # Colors for patron states
 COLOR_ROAMING = 'limegreen'
@@ -40,6 +44,9 @@ COLOR_QUEUING = 'dodgerblue'
 COLOR_RIDING = 'gold'
 COLOR_EXITING = 'orange'
 
+# Ride-count badges are only drawn on patrons when the park is this small
+MAX_PATRON_LABELS = 40
+
 # Colors for park elements
 COLOR_ENTRANCE = 'g^'
 COLOR_EXIT = 'rv'
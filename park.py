@@ -1,15 +1,43 @@
+import logging
 import random
 import math
-import matplotlib.pyplot as plt
+from functools import lru_cache
+import numpy as np
 import matplotlib.patches as patches
 from matplotlib.patches import Circle, Rectangle, FancyBboxPatch
-from patron import Patron
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.colors import to_rgba
+from patron import Patron, PATRON_COLUMNS, PATRON_DTYPE, PATRON_STATES, PATRON_STATE_CODES, N_ROLLS
+from patron import draw_personality_traits
+from _patron_kernels import roam_step, step_in_direction, BoxGrid
+from _patron_kernels import ANGLE_STEPS, angle_index
+from config import PatronState
 from config import DEFAULT_PARK_WIDTH, DEFAULT_PARK_HEIGHT, COLOR_ENTRANCE, COLOR_EXIT
+from config import RIDE_OVERLAP_BUFFER, MAX_PATRON_LABELS, OBSTACLE_CELL_SIZE
+from config import COLOR_ROAMING, COLOR_QUEUING, COLOR_RIDING, COLOR_EXITING
+
+
+logger = logging.getLogger(__name__)
+
+ROAMING = PATRON_STATE_CODES[PatronState.ROAMING]
+QUEUING = PATRON_STATE_CODES[PatronState.QUEUING]
+RIDING = PATRON_STATE_CODES[PatronState.RIDING]
+EXITING = PATRON_STATE_CODES[PatronState.EXITING]
+
+# Marker style per patron state: (code, label, marker, size, edge, edge width)
+PATRON_MARKERS = (
+    (ROAMING, 'Roaming', 'o', 7, 'darkgreen', 1.5),
+    (EXITING, 'Exiting', 's', 7, 'darkorange', 1.5),
+    (QUEUING, 'Queuing', '^', 8, 'navy', 1.5),
+    (RIDING, 'Riding', '*', 12, 'orange', 2),
+)
 
 
 class TerrainObject:
     """Represents obstacles and decorations in the park."""
     
+    __slots__ = ('x', 'y', 'width', 'height', 'type', 'tree_centers')
+    
     def __init__(self, x, y, width, height, object_type="obstacle"):
         """Initialize a terrain object."""
         self.x = x
@@ -17,6 +45,23 @@ class TerrainObject:
         self.width = width
         self.height = height
         self.type = object_type
+        
+        # Decorative trees on obstacles are drawn in one batch by Park.plot
+        self.tree_centers = []
+    
+    def place_trees(self, rng):
+        """
+        Pick the decorative tree positions for an obstacle once.
+        
+        Parameters:
+            rng (random.Random): Random generator owned by the park
+        """
+        self.tree_centers = []
+        if self.type == "obstacle":
+            for i in range(3):
+                cx = self.x + rng.uniform(-self.width/3, self.width/3)
+                cy = self.y + rng.uniform(-self.height/3, self.height/3)
+                self.tree_centers.append((cx, cy))
     
     def get_bounding_box(self):
         """Get bounding box of terrain object."""
@@ -27,9 +72,13 @@ class TerrainObject:
         return (x_min, y_min, x_max, y_max)
     
     def contains_point(self, x, y):
-        """Check if a point is inside this terrain object."""
-        box = self.get_bounding_box()
-        return box[0] <= x <= box[2] and box[1] <= y <= box[3]
+        """
+        Check if a point is inside this terrain object (edges included).
+        
+        Both axes are always evaluated and combined with &, so x and y may
+        also be NumPy arrays to test many points at once.
+        """
+        return (abs(x - self.x) * 2 <= self.width) & (abs(y - self.y) * 2 <= self.height)
     
     def plot(self, ax):
         """Plot the terrain object with enhanced visuals."""
@@ -41,12 +90,6 @@ class TerrainObject:
                                  facecolor='forestgreen', edgecolor='darkgreen',
                                  linewidth=2, alpha=0.7, zorder=1)
             ax.add_patch(rect)
-            for i in range(3):
-                cx = self.x + random.uniform(-self.width/3, self.width/3)
-                cy = self.y + random.uniform(-self.height/3, self.height/3)
-                tree = Circle((cx, cy), 0.8, facecolor='green', 
-                             edgecolor='darkgreen', linewidth=1, alpha=0.8)
-                ax.add_patch(tree)
                 
         elif self.type == "boundary":
             rect = Rectangle((box[0], box[1]), self.width, self.height,
@@ -64,14 +107,62 @@ class TerrainObject:
 class Park:
     """PERFECT SPACING park - optimized for 1-6 rides."""
     
-    def __init__(self, width=280, height=200):
-        """Initialize the park with extra large dimensions."""
+    def __init__(self, width=280, height=200, seed=None):
+        """
+        Initialize the park with extra large dimensions.
+        
+        Parameters:
+            width (float): Park width
+            height (float): Park height
+            seed (int): Seed for the decorative layout (grass and trees) and
+                the patron random numbers, drawn from the random module
+                when not given
+        """
         self.width = width
         self.height = height
         self.rides = []
         self.patrons = []
         self.terrain_objects = []
         self.patron_strategy = 'balanced'  # NEW: Patron strategy control
+        self.total_queue_len = 0  # Patrons queuing across all rides, kept by the rides
+        
+        # Ride bounding boxes as rows of (x_min, y_min, x_max, y_max), indexed
+        # by ride.id, so placement checks every ride in one array compare
+        self._ride_bbox = np.empty((0, 4), dtype=np.float32)
+        
+        # Ride centres (as arrays) and capacities, indexed by ride.id, for
+        # batch distance and queue checks
+        self._ride_x = np.empty(0, dtype=np.float32)
+        self._ride_y = np.empty(0, dtype=np.float32)
+        self._ride_capacity = []
+        
+        # Bound step_change of each ride, so the tick loop skips the lookup
+        self._ride_tick_fns = []
+        
+        # Patron step for each state code (None where nothing happens);
+        # exiting is last, since patrons leaving the park move other rows
+        self._state_steps = (self._step_roaming, self._step_queuing,
+                             None, self._step_exiting)
+        
+        # Obstacle boxes bucketed by cell, built on first use and reset
+        # whenever a ride or terrain object is added
+        self._obstacles = None
+        
+        # Patron values in one structured array, with each field also bound
+        # as patron_x, patron_y, patron_state, ...; row i belongs to
+        # self.patrons[i]
+        self._patron_capacity = 0
+        self._grow_patron_arrays()
+        
+        # Spawning and patron decisions; without a seed it is drawn from the
+        # random module so random.seed() still reproduces a run
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._np_rng = np.random.default_rng(seed)
+        
+        # Uniforms for each patron's random decisions this tick (rows match
+        # the patron arrays, columns are patron.ROLL_*)
+        self.tick_rolls = np.empty((0, N_ROLLS))
         
         # Entrances and exits at corners
         self.entrances = [
@@ -85,8 +176,83 @@ class Park:
             (width/2, height - 25)
         ]
         
+        # Decorations are drawn once from a dedicated RNG so every frame
+        # shows the same static layer
+        self._rng = random.Random(seed)
+        self._grass_x = []
+        self._grass_y = []
+        for i in range(0, int(width), 20):
+            for j in range(0, int(height), 20):
+                if self._rng.random() < 0.2:
+                    self._grass_x.append(i)
+                    self._grass_y.append(j)
+        
         self._setup_park()
     
+    def reseed(self, seed):
+        """
+        Restart the random numbers used for spawning and patron decisions.
+        
+        Parameters:
+            seed (int or np.random.SeedSequence): Seed for the park's NumPy generator
+        """
+        self._np_rng = np.random.default_rng(seed)
+    
+    @property
+    def rng(self):
+        """NumPy generator for spawning and patron decisions; see reseed."""
+        return self._np_rng
+    
+    @property
+    def exits(self):
+        """
+        Exit positions as a tuple; assign a new sequence to change them so
+        the nearest-exit grid is rebuilt.
+        """
+        return self._exits
+    
+    @exits.setter
+    def exits(self, exits):
+        self._exits = tuple(exits)
+        self._exit_xy = np.array(self._exits, dtype=np.float32).reshape(-1, 2)
+        self._nearest_exit_idx = self._build_exit_grid()
+    
+    def _build_exit_grid(self):
+        """
+        Precompute the index of the nearest exit for every unit cell.
+        
+        Returns:
+            np.ndarray: (height + 1, width + 1) array of exit indices, or None
+            if the park has no exits
+        """
+        if not self._exits:
+            return None
+        
+        exits = np.array(self._exits, dtype=float)
+        cell_x = np.arange(int(self.width) + 1) + 0.5
+        cell_y = np.arange(int(self.height) + 1) + 0.5
+        d2 = ((cell_x[None, :, None] - exits[:, 0]) ** 2 +
+              (cell_y[:, None, None] - exits[:, 1]) ** 2)
+        return d2.argmin(axis=2).astype(np.int32)
+    
+    def nearest_exit(self, x, y):
+        """
+        Look up the exit closest to a position.
+        
+        Parameters:
+            x (float): X coordinate
+            y (float): Y coordinate
+            
+        Returns:
+            tuple: (x, y) of the nearest exit, or None if there are no exits
+        """
+        grid = self._nearest_exit_idx
+        if grid is None:
+            return None
+        row = min(max(int(y), 0), grid.shape[0] - 1)
+        col = min(max(int(x), 0), grid.shape[1] - 1)
+        return self._exits[grid[row, col]]
+    
     def _setup_park(self):
         """Setup park boundaries."""
         wall_thickness = 5
@@ -113,55 +279,61 @@ class Park:
         Returns:
             list: List of (x, y) positions
         """
+        return list(Park._layout(num_rides, self.width, self.height))
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _layout(num_rides, width, height):
+        """Compute (and memoize) the ride layout for a park size."""
         positions = []
         
         if num_rides == 1:
             # Single ride in center
-            positions = [(self.width/2, self.height/2)]
+            positions = [(width/2, height/2)]
             
         elif num_rides == 2:
             # Two rides side by side with huge spacing
             positions = [
-                (self.width * 0.3, self.height/2),
-                (self.width * 0.7, self.height/2)
+                (width * 0.3, height/2),
+                (width * 0.7, height/2)
             ]
             
         elif num_rides == 3:
             # Triangle formation
             positions = [
-                (self.width/2, self.height * 0.35),
-                (self.width * 0.3, self.height * 0.65),
-                (self.width * 0.7, self.height * 0.65)
+                (width/2, height * 0.35),
+                (width * 0.3, height * 0.65),
+                (width * 0.7, height * 0.65)
             ]
             
         elif num_rides == 4:
             # Square formation
             positions = [
-                (self.width * 0.3, self.height * 0.35),
-                (self.width * 0.7, self.height * 0.35),
-                (self.width * 0.3, self.height * 0.65),
-                (self.width * 0.7, self.height * 0.65)
+                (width * 0.3, height * 0.35),
+                (width * 0.7, height * 0.35),
+                (width * 0.3, height * 0.65),
+                (width * 0.7, height * 0.65)
             ]
             
         elif num_rides == 5:
             # Pentagon-like formation
             positions = [
-                (self.width * 0.25, self.height * 0.3),
-                (self.width * 0.75, self.height * 0.3),
-                (self.width * 0.25, self.height * 0.7),
-                (self.width * 0.75, self.height * 0.7),
-                (self.width * 0.5, self.height * 0.5)
+                (width * 0.25, height * 0.3),
+                (width * 0.75, height * 0.3),
+                (width * 0.25, height * 0.7),
+                (width * 0.75, height * 0.7),
+                (width * 0.5, height * 0.5)
             ]
             
         elif num_rides == 6:
             # 2 rows of 3
             positions = [
-                (self.width * 0.25, self.height * 0.35),
-                (self.width * 0.5, self.height * 0.35),
-                (self.width * 0.75, self.height * 0.35),
-                (self.width * 0.25, self.height * 0.65),
-                (self.width * 0.5, self.height * 0.65),
-                (self.width * 0.75, self.height * 0.65)
+                (width * 0.25, height * 0.35),
+                (width * 0.5, height * 0.35),
+                (width * 0.75, height * 0.35),
+                (width * 0.25, height * 0.65),
+                (width * 0.5, height * 0.65),
+                (width * 0.75, height * 0.65)
             ]
         
         else:
@@ -169,8 +341,8 @@ class Park:
             cols = 3
             rows = math.ceil(num_rides / cols)
             margin = 40
-            x_spacing = (self.width - 2*margin) / (cols + 1)
-            y_spacing = (self.height - 2*margin) / (rows + 1)
+            x_spacing = (width - 2*margin) / (cols + 1)
+            y_spacing = (height - 2*margin) / (rows + 1)
             
             for i in range(num_rides):
                 col = i % cols
@@ -179,70 +351,506 @@ class Park:
                 y = margin + (row + 1) * y_spacing
                 positions.append((x, y))
         
-        return positions[:num_rides]
+        return tuple(positions[:num_rides])
     
     def add_ride(self, ride):
-        """Add a ride to the park if it doesn't overlap."""
-        for existing_ride in self.rides:
-            if ride.overlaps_with(existing_ride):
-                print(f"⚠ Cannot add {ride.name}: overlaps with {existing_ride.name}")
-                return False
+        """
+        Add a ride to the park if it doesn't overlap.
         
+        Parameters:
+            ride (Ride): The ride to place
+            
+        Returns:
+            bool: True if the ride was added
+        """
+        box = ride.get_bounding_box()
+        overlapping = self._ride_overlaps(*box)
+        if overlapping.any():
+            existing_ride = self.rides[int(overlapping.argmax())]
+            print(f"⚠ Cannot add {ride.name}: overlaps with {existing_ride.name}")
+            return False
+        
+        ride.id = len(self.rides)
+        ride.park = self
+        self.total_queue_len += len(ride.queue)
         self.rides.append(ride)
+        self._ride_x = np.append(self._ride_x, np.float32(ride.x))
+        self._ride_y = np.append(self._ride_y, np.float32(ride.y))
+        self._ride_bbox = np.vstack([self._ride_bbox,
+                                     np.array(box, dtype=np.float32)])
+        self._ride_capacity.append(ride.capacity)
+        self._ride_tick_fns.append(ride.step_change)
+        self._obstacles = None
         print(f"✓ Added {ride.name} at ({ride.x:.1f}, {ride.y:.1f})")
         return True
     
+    def _grow_patron_arrays(self):
+        """Double the capacity of the patron record array."""
+        capacity = max(64, 2 * self._patron_capacity)
+        count = len(self.patrons)
+        records = np.zeros(capacity, dtype=PATRON_DTYPE)
+        if self._patron_capacity:
+            records[:count] = self.patrons_arr[:count]
+        self.patrons_arr = records
+        for name in PATRON_COLUMNS:
+            setattr(self, 'patron_' + name, records[name])
+        self._patron_capacity = capacity
+    
     def add_patron(self, patron):
-        """Add a patron to the park."""
+        """Add a patron to the park, giving it a row in the patron arrays."""
+        if len(self.patrons) == self._patron_capacity:
+            self._grow_patron_arrays()
+        
+        values = {name: getattr(patron, name) for name in PATRON_COLUMNS}
+        patron.park = self
+        patron.idx = len(self.patrons)
+        for name, value in values.items():
+            setattr(patron, name, value)
+        
         self.patrons.append(patron)
     
     def remove_patron(self, patron):
-        """Remove a patron from the park."""
-        if patron in self.patrons:
-            self.patrons.remove(patron)
+        """Remove a patron from the park, moving the last row into its slot."""
+        if patron.park is not self:
+            return
+        self.remove_patrons([patron.idx])
+    
+    def remove_patrons(self, rows):
+        """
+        Remove several patrons at once.
+        
+        The freed rows below the new patron count are filled from the
+        surviving rows at the end, so removal is a single block move.
+        
+        Parameters:
+            rows (array-like): Rows of the patrons to remove
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        count = len(self.patrons)
+        new_count = count - len(rows)
+        
+        for row in rows.tolist():
+            patron = self.patrons[row]
+            values = {name: getattr(patron, name) for name in PATRON_COLUMNS}
+            patron.park = None
+            patron.idx = None
+            for name, value in values.items():
+                setattr(patron, name, value)
+        
+        holes = rows[rows < new_count]
+        tail = np.setdiff1d(np.arange(new_count, count), rows)
+        self.patrons_arr[holes] = self.patrons_arr[tail]
+        for hole, row in zip(holes.tolist(), tail.tolist()):
+            moved = self.patrons[row]
+            self.patrons[hole] = moved
+            moved.idx = hole
+        del self.patrons[new_count:]
+    
+    def state_counts(self):
+        """
+        Count the patrons in each state with one pass over the state codes.
+        
+        Returns:
+            dict: Number of patrons for every PatronState
+        """
+        counts = np.bincount(self.patron_state[:len(self.patrons)],
+                             minlength=len(PATRON_STATES))
+        return dict(zip(PATRON_STATES, counts.tolist()))
     
     def spawn_patron(self, patron_id):
         """Spawn a new patron at a random entrance with strategy control."""
-        entrance = random.choice(self.entrances)
-        x = entrance[0] + random.uniform(-2, 2)
-        y = entrance[1] + random.uniform(-2, 2)
+        return self.spawn_patrons(patron_id, 1)[0]
+    
+    def spawn_patrons(self, first_id, count):
+        """
+        Spawn several patrons at random entrances with strategy control.
+        
+        Entrances, personalities and personality traits are drawn for the
+        whole group with a few vectorized calls.
+        
+        Parameters:
+            first_id (int): ID of the first patron; the rest follow on
+            count (int): Number of patrons to spawn
+            
+        Returns:
+            list: The new patrons
+        """
+        rng = self._np_rng
+        entrances = np.array(self.entrances)[rng.integers(len(self.entrances), size=count)]
+        xs = entrances[:, 0] + rng.uniform(-2, 2, count)
+        ys = entrances[:, 1] + rng.uniform(-2, 2, count)
         
         # Apply strategy setting - NEW!
         if self.patron_strategy == 'casual':
-            personality = 'casual'
+            personalities = ['casual'] * count
         elif self.patron_strategy == 'thrill_seeker':
-            personality = 'thrill_seeker'
+            personalities = ['thrill_seeker'] * count
         elif self.patron_strategy == 'random':
-            personality = random.choice(['casual', 'balanced', 'thrill_seeker'])
+            personalities = rng.choice(['casual', 'balanced', 'thrill_seeker'], count)
         else:  # balanced
             # Weighted toward balanced
-            personality = random.choice(['casual', 'balanced', 'balanced', 'thrill_seeker'])
+            personalities = rng.choice(['casual', 'balanced', 'balanced', 'thrill_seeker'], count)
         
-        patron = Patron(patron_id, x, y, personality=personality)
-        self.add_patron(patron)
-        return patron
+        traits = draw_personality_traits(personalities, rng)
+        patrons = []
+        for i in range(count):
+            patron = Patron(first_id + i, xs[i].item(), ys[i].item(),
+                            personality=str(personalities[i]),
+                            traits={name: values[i] for name, values in traits.items()})
+            self.add_patron(patron)
+            patrons.append(patron)
+        return patrons
+    
+    def _ride_overlaps(self, x_min, y_min, x_max, y_max):
+        """
+        Check a box against every ride's box, including the overlap buffer.
+        
+        Returns:
+            np.ndarray: Boolean mask over rides (indexed by ride.id)
+        """
+        boxes = self._ride_bbox
+        buffer = RIDE_OVERLAP_BUFFER
+        return ((x_min <= boxes[:, 2] + buffer) & (x_max + buffer >= boxes[:, 0]) &
+                (y_min <= boxes[:, 3] + buffer) & (y_max + buffer >= boxes[:, 1]))
+    
+    def overlaps_any(self, x_min, y_min, x_max, y_max):
+        """
+        Check whether a box would overlap any ride in the park.
+        
+        Parameters:
+            x_min, y_min, x_max, y_max (float): Bounding box to test
+            
+        Returns:
+            bool: True if the box comes within RIDE_OVERLAP_BUFFER of a ride
+        """
+        return bool(self._ride_overlaps(x_min, y_min, x_max, y_max).any())
     
     def is_valid_position(self, x, y):
         """Check if a position is valid for patron movement."""
         if x < 12 or x > self.width - 12 or y < 12 or y > self.height - 12:
             return False
         
-        for obj in self.terrain_objects:
-            if obj.type != "pathway" and obj.contains_point(x, y):
-                return False
+        # Only the obstacles sharing the point's grid cell need testing
+        return self._obstacle_grid().point_outside(x, y)
+    
+    def _obstacle_grid(self):
+        """
+        Get the grid of patron obstacles, rebuilding it after add_ride or
+        add_terrain_object has reset it.
         
-        for ride in self.rides:
-            box = ride.get_bounding_box()
+        Returns:
+            BoxGrid: Non-pathway terrain and ride boxes (plus a buffer of 2)
+        """
+        if self._obstacles is None:
+            boxes = [obj.get_bounding_box() for obj in self.terrain_objects
+                     if obj.type != "pathway"]
             buffer = 2
-            if (box[0] - buffer <= x <= box[2] + buffer and 
-                box[1] - buffer <= y <= box[3] + buffer):
-                return False
+            for ride in self.rides:
+                box = ride.get_bounding_box()
+                boxes.append((box[0] - buffer, box[1] - buffer,
+                              box[2] + buffer, box[3] + buffer))
+            self._obstacles = BoxGrid(boxes, self.width, self.height,
+                                      OBSTACLE_CELL_SIZE)
+        return self._obstacles
+    
+    def valid_positions(self, xs, ys):
+        """
+        Vectorized is_valid_position for arrays of coordinates.
         
-        return True
+        Parameters:
+            xs (np.ndarray): X coordinates
+            ys (np.ndarray): Y coordinates
+            
+        Returns:
+            np.ndarray: Boolean mask of valid positions
+        """
+        valid = ((xs >= 12) & (xs <= self.width - 12) &
+                 (ys >= 12) & (ys <= self.height - 12))
+        
+        valid &= self._obstacle_grid().outside(xs, ys)
+        return valid
+    
+    def step_patrons(self, rows=None):
+        """
+        Advance patrons by one timestep as a batch.
+        
+        Time counters, immobility timers and roaming movement are vectorized
+        over the patron arrays; only the per-patron decisions (choosing a
+        ride, joining or leaving a queue, exiting) run in Python.
+        
+        Parameters:
+            rows (np.ndarray): Patron rows to update, defaults to all patrons
+            
+        Returns:
+            int: Number of patrons that left the park
+        """
+        if rows is None:
+            rows = np.arange(len(self.patrons))
+        if len(rows) == 0:
+            return 0
+        
+        # One draw covers every random decision patrons make this tick; a
+        # partial step only draws for the rows it updates
+        if len(rows) == len(self.patrons):
+            self.tick_rolls = self._np_rng.random((len(rows), N_ROLLS))
+        else:
+            if len(self.tick_rolls) != len(self.patrons):
+                self.tick_rolls = np.empty((len(self.patrons), N_ROLLS))
+            self.tick_rolls[rows] = self._np_rng.random((len(rows), N_ROLLS))
+        
+        # Group the rows by state with one stable sort of the state codes, so
+        # each state is a contiguous slice that keeps the patrons' row order.
+        # Only the row indices move, never the patron records
+        state = self.patron_state[rows]
+        order = np.argsort(state, kind='stable')
+        rows, state = rows[order], state[order]
+        codes = np.arange(len(PATRON_STATES) + 1)
+        
+        bounds = np.searchsorted(state, codes)
+        self.patron_time_in_park[rows] += 1
+        self.patron_time_roaming[rows[bounds[ROAMING]:bounds[ROAMING + 1]]] += 1
+        self.patron_time_queuing[rows[bounds[QUEUING]:bounds[QUEUING + 1]]] += 1
+        self.patron_time_riding[rows[bounds[RIDING]:bounds[RIDING + 1]]] += 1
+        
+        # Patrons just off a ride stand still until their timer runs out;
+        # dropping them keeps the rest grouped
+        frozen = self.patron_immobile_timer[rows] > 0
+        self.patron_immobile_timer[rows[frozen]] -= 1
+        active = rows[~frozen]
+        bounds = np.searchsorted(state[~frozen], codes)
+        
+        count = len(self.patrons)
+        for code, step in enumerate(self._state_steps):
+            if step is not None:
+                step(active[bounds[code]:bounds[code + 1]])
+        return count - len(self.patrons)
+    
+    def _step_roaming(self, rows):
+        """Move roaming patrons and record their trails."""
+        self._move_roaming(rows)
+        self._record_trails(rows)
+    
+    def _step_queuing(self, rows):
+        """Let queuing patrons give up and record trails of those that did."""
+        self._check_queue_patience(rows)
+        self._record_trails(rows)
+    
+    def _step_exiting(self, rows):
+        """Walk exiting patrons out and record trails of those still walking."""
+        for patron in self._move_exiting(rows):
+            patron.record_position()
+    
+    def _record_trails(self, rows):
+        """Record the positions of the patrons in rows now roaming or exiting."""
+        state = self.patron_state[rows]
+        for i in rows[(state == ROAMING) | (state == EXITING)]:
+            self.patrons[i].record_position()
+    
+    def _check_queue_patience(self, rows):
+        """Let queuing patrons give up on long queues."""
+        for i in rows:
+            self.patrons[i].check_queue_patience(self)
+    
+    def _move_exiting(self, rows):
+        """
+        Walk exiting patrons toward their nearest exit in one batch.
+        
+        Patrons within 2 of their exit leave the park together.
+        
+        Parameters:
+            rows (np.ndarray): Rows of the exiting patrons
+            
+        Returns:
+            list: The patrons still walking (all of them if there are no exits)
+        """
+        grid = self._nearest_exit_idx
+        if grid is None or len(rows) == 0:
+            return [self.patrons[i] for i in rows]
+        
+        x = self.patron_x[rows]
+        y = self.patron_y[rows]
+        grid_row = np.clip(y.astype(np.int64), 0, grid.shape[0] - 1)
+        grid_col = np.clip(x.astype(np.int64), 0, grid.shape[1] - 1)
+        exit_xy = self._exit_xy[grid[grid_row, grid_col]]
+        dx = exit_xy[:, 0] - x
+        dy = exit_xy[:, 1] - y
+        distance_sq = dx * dx + dy * dy
+        
+        arrived = distance_sq < 2 ** 2
+        walking = ~arrived
+        step = self.patron_move_speed[rows[walking]] / np.sqrt(distance_sq[walking])
+        self.patron_x[rows[walking]] = x[walking] + step * dx[walking]
+        self.patron_y[rows[walking]] = y[walking] + step * dy[walking]
+        walkers = [self.patrons[i] for i in rows[walking]]
+        
+        if arrived.any():
+            if logger.isEnabledFor(logging.DEBUG):
+                for i in rows[arrived]:
+                    patron = self.patrons[i]
+                    logger.debug("  👋 Patron %s (%s) exiting after %d rides!",
+                                 patron.id, patron.personality, patron.rides_completed)
+            self.remove_patrons(rows[arrived])
+        return walkers
+    
+    def _move_roaming(self, rows):
+        """
+        Let roaming patrons decide, then step them all at once.
+        
+        Parameters:
+            rows (np.ndarray): Rows of the roaming patrons
+        """
+        targets = [self.patrons[i].plan_roam(self) for i in rows]
+        target_ids = np.array([t.id if t else -1 for t in targets], dtype=np.int64)
+        has_target = target_ids >= 0
+        
+        # Distances to every patron's target ride in one go
+        x = self.patron_x[rows]
+        y = self.patron_y[rows]
+        target_x = np.full(len(rows), np.nan, dtype=np.float32)
+        target_y = np.full(len(rows), np.nan, dtype=np.float32)
+        target_x[has_target] = self._ride_x[target_ids[has_target]]
+        target_y[has_target] = self._ride_y[target_ids[has_target]]
+        dx = target_x - x
+        dy = target_y - y
+        distance_sq = dx * dx + dy * dy
+        
+        # Only patrons close to their ride (within 15) consider joining its
+        # queue; queue lengths are read once and kept current as they join
+        near = distance_sq < 15 ** 2
+        if near.any():
+            queue_lens = [len(ride.queue) for ride in self.rides]
+            for i, ride_id in zip(rows[near], target_ids[near]):
+                if self.patrons[i].try_join_queue(queue_lens[ride_id],
+                                                  self._ride_capacity[ride_id]):
+                    queue_lens[ride_id] += 1
+        
+        # Patrons that joined a queue or headed for the exit don't move;
+        # the rest head for their target with some wandering, or random
+        # walk without one
+        moving = ((self.patron_state[rows] == ROAMING) &
+                  (~has_target | (distance_sq > 1)))
+        rows, x, y = rows[moving], x[moving], y[moving]
+        speed = self.patron_move_speed[rows]
+        target_x, target_y = target_x[moving], target_y[moving]
+        has_target = has_target[moving]
+        if len(rows) == 0:
+            return
+        
+        count = len(rows)
+        new_x, new_y = roam_step(x, y, speed, target_x, target_y, has_target,
+                                 angle_index(self._np_rng.uniform(-0.3, 0.3, count)),
+                                 self._np_rng.integers(0, ANGLE_STEPS, count))
+        valid = self.valid_positions(new_x, new_y)
+        
+        # If blocked on the way to a ride, try a random direction
+        retry = ~valid & has_target
+        if retry.any():
+            angle = self._np_rng.integers(0, ANGLE_STEPS, retry.sum())
+            new_x[retry], new_y[retry] = step_in_direction(
+                x[retry], y[retry], speed[retry], angle)
+            valid[retry] = self.valid_positions(new_x[retry], new_y[retry])
+        
+        self.patron_x[rows[valid]] = new_x[valid]
+        self.patron_y[rows[valid]] = new_y[valid]
     
     def add_terrain_object(self, terrain_obj):
         """Add a terrain object to the park."""
+        terrain_obj.place_trees(self._rng)
         self.terrain_objects.append(terrain_obj)
+        self._obstacles = None
+    
+    def _plot_trails(self, ax):
+        """Draw every roaming patron's movement trail as one LineCollection."""
+        count = len(self.patrons)
+        roaming = np.flatnonzero(self.patron_state[:count] == ROAMING)
+        has_target = self.patron_target_id[roaming] >= 0
+        
+        segments = []
+        colors = []
+        for i, targeted in zip(roaming.tolist(), has_target.tolist()):
+            history = self.patrons[i].path_history
+            if len(history) > 1:
+                path = history.points()
+                segments.append(np.stack([path[:-1], path[1:]], axis=1))
+                
+                # Fade in towards the newest segment
+                rgba = np.tile(to_rgba('green' if targeted else 'gray'),
+                               (len(path) - 1, 1))
+                rgba[:, 3] = np.arange(1, len(path)) / len(path) * 0.4
+                colors.append(rgba)
+        
+        if segments:
+            ax.add_collection(LineCollection(np.concatenate(segments),
+                                             colors=np.concatenate(colors),
+                                             linewidths=1))
+    
+    def plot_patrons(self, ax):
+        """
+        Draw all patrons with one scatter call per state.
+        
+        Parameters:
+            ax: Matplotlib axes to draw on
+        """
+        count = len(self.patrons)
+        if count == 0:
+            return
+        
+        xs = self.patron_x[:count]
+        ys = self.patron_y[:count]
+        states = self.patron_state[:count]
+        targets = self.patron_target_id[:count]
+        
+        # Faint line from each roaming patron to the ride it is heading for
+        linked = (targets >= 0) & (states == ROAMING)
+        if linked.any():
+            links = np.stack([
+                np.column_stack([xs[linked], ys[linked]]),
+                np.column_stack([self._ride_x[targets[linked]],
+                                 self._ride_y[targets[linked]]]),
+            ], axis=1)
+            ax.add_collection(LineCollection(links, colors='g', linestyles='--',
+                                             alpha=0.2, linewidths=0.5))
+        
+        fill = {
+            EXITING: COLOR_EXITING,
+            QUEUING: COLOR_QUEUING,
+            RIDING: COLOR_RIDING,
+        }
+        for code, label, marker, size, edge, edge_width in PATRON_MARKERS:
+            mask = states == code
+            if not mask.any():
+                continue
+            if code == ROAMING:
+                colors = np.where(targets[mask] >= 0, COLOR_ROAMING, 'yellowgreen')
+            else:
+                colors = fill[code]
+            ax.scatter(xs[mask], ys[mask], s=size ** 2, c=colors, marker=marker,
+                      edgecolors=edge, linewidths=edge_width, label=label,
+                      zorder=5)
+        
+        # Completed-ride badges are expensive text artists; small parks only
+        if count <= MAX_PATRON_LABELS:
+            for i, patron in enumerate(self.patrons):
+                if states[i] in (ROAMING, EXITING) and patron.rides_completed > 0:
+                    ax.text(xs[i], ys[i] + 1.2, str(patron.rides_completed), 
+                           fontsize=7, ha='center', weight='bold',
+                           color='white', 
+                           bbox=dict(boxstyle='circle', facecolor='green', 
+                                    alpha=0.8, pad=0.2))
+    
+    def frame(self, ax):
+        """
+        Advance patrons one timestep and redraw the park.
+        
+        Drawing reads the same patron arrays the step just updated, right
+        after it, without another pass over Patron objects for positions,
+        states or targets.
+        
+        Parameters:
+            ax: Matplotlib axes to draw on
+        """
+        self.step_patrons()
+        self.plot(ax)
     
     def plot(self, ax):
         """Plot the park with PERFECT spacing and NO overlaps."""
@@ -255,16 +863,22 @@ class Park:
         ax.set_facecolor('#e8f5e9')
         
         # Minimal grass texture
-        for i in range(0, int(self.width), 20):
-            for j in range(0, int(self.height), 20):
-                if random.random() < 0.2:
-                    ax.plot(i, j, '.', color='#81c784', 
-                           markersize=1.5, alpha=0.3)
+        ax.plot(self._grass_x, self._grass_y, '.', color='#81c784', 
+               markersize=1.5, alpha=0.3)
         
         # Plot terrain
         for obj in self.terrain_objects:
             obj.plot(ax)
         
+        # All obstacle trees in a single collection instead of one patch each;
+        # circles keep their radius in data units, so they scale with the park
+        tree_centers = [c for obj in self.terrain_objects for c in obj.tree_centers]
+        if tree_centers:
+            trees = PatchCollection([Circle(center, 0.8) for center in tree_centers],
+                                    facecolor='green', edgecolor='darkgreen',
+                                    linewidth=1, alpha=0.8, zorder=1)
+            ax.add_collection(trees)
+        
         # Plot entrances
         for i, entrance in enumerate(self.entrances):
             platform = FancyBboxPatch(
@@ -310,8 +924,8 @@ class Park:
             ride.plot(ax)
         
         # Plot all patrons
-        for patron in self.patrons:
-            patron.plot(ax)
+        self._plot_trails(ax)
+        self.plot_patrons(ax)
         
         # Subtle grid
         ax.grid(True, alpha=0.12, linestyle=':', linewidth=0.5, color='gray')
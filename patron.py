@@ -3,41 +3,209 @@ patron.py
 FIXED: Smart Patron system with working exit behavior and personality types.
 """
 
+import logging
 import math
 import random
+import numpy as np
 from config import PatronState, DEFAULT_PATRON_MOVE_SPEED, DEFAULT_PATRON_IMMOBILE_TIME
-from config import COLOR_ROAMING, COLOR_EXITING
+
+
+logger = logging.getLogger(__name__)
+
+# Patron states are stored as their integer values in the park's arrays
+PATRON_STATES = tuple(PatronState)
+PATRON_STATE_CODES = {state: int(state) for state in PATRON_STATES}
+
+# Per-patron values kept in NumPy arrays (structure of arrays) on the park
+PATRON_COLUMNS = {
+    'x': np.float32,
+    'y': np.float32,
+    'state': np.int8,
+    'move_speed': np.float32,
+    'immobile_timer': np.int16,
+    'time_in_park': np.int32,
+    'time_queuing': np.int32,
+    'time_riding': np.int32,
+    'time_roaming': np.int32,
+    'target_id': np.int32,  # current_target's ride id, -1 for none
+}
+
+# One record per patron; the park's patron_<name> arrays are field views
+PATRON_DTYPE = np.dtype(list(PATRON_COLUMNS.items()), align=True)
+
+# Columns of Park.tick_rolls, the uniforms drawn for every patron each tick
+ROLL_EXIT, ROLL_PICK, ROLL_JOIN, ROLL_PATIENCE = range(4)
+N_ROLLS = 4
+
+
+# Personality traits: (desired rides range, patience range, speed scale,
+# speed jitter range). Ranges are inclusive; unknown personalities are balanced.
+PERSONALITIES = ('casual', 'balanced', 'thrill_seeker')
+PERSONALITY_TRAITS = np.array([
+    # rides_lo, rides_hi, patience_lo, patience_hi, speed_scale, jitter_lo, jitter_hi
+    (1, 3, 3, 8, 0.8, 0.0, 0.0),        # casual: fewer rides, slower, less patient
+    (2, 4, 5, 15, 1.0, -0.1, 0.15),     # balanced
+    (4, 6, 15, 25, 1.3, 0.0, 0.0),      # thrill_seeker: more rides, faster, patient
+])
+
+
+def draw_personality_traits(personalities, rng=None):
+    """
+    Draw personality-based attributes for many patrons in one go.
+    
+    Parameters:
+        personalities (list): Personality name of each patron
+        rng (np.random.Generator): Random generator, defaults to one seeded
+            from the random module so random.seed() reproduces the draw
+        
+    Returns:
+        dict: Arrays of desired_rides, move_speed, patience and adventure_level
+    """
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    ids = np.array([PERSONALITIES.index(p) if p in PERSONALITIES else 1
+                    for p in personalities], dtype=np.int64)
+    traits = PERSONALITY_TRAITS[ids]
+    count = len(ids)
+    
+    rides_lo, rides_hi, patience_lo, patience_hi = traits[:, :4].astype(np.int64).T
+    speed_scale, jitter_lo, jitter_hi = traits[:, 4:].T
+    return {
+        'desired_rides': rng.integers(rides_lo, rides_hi + 1),
+        'move_speed': (DEFAULT_PATRON_MOVE_SPEED * speed_scale +
+                       rng.uniform(jitter_lo, jitter_hi)),
+        'patience': rng.integers(patience_lo, patience_hi + 1),
+        'adventure_level': rng.random(count),
+    }
+
+
+class ParkColumn:
+    """
+    Patron attribute backed by one of the park's per-patron arrays.
+    
+    A patron outside a park keeps the value on the instance. Once
+    Park.add_patron gives it a row, reads and writes go to
+    park.patron_<name>[patron.idx] so the park can update every patron
+    with vectorized operations.
+    """
+    
+    def __init__(self, encode=None, decode=None):
+        """Initialize with optional converters to and from the array value."""
+        self.encode = encode
+        self.decode = decode
+    
+    def __set_name__(self, owner, name):
+        self.array_name = 'patron_' + name
+        self.local_name = '_' + name
+    
+    def __get__(self, patron, owner=None):
+        if patron is None:
+            return self
+        if patron.park is None:
+            return getattr(patron, self.local_name)
+        value = getattr(patron.park, self.array_name)[patron.idx].item()
+        return self.decode(value) if self.decode else value
+    
+    def __set__(self, patron, value):
+        if patron.park is None:
+            setattr(patron, self.local_name, value)
+        else:
+            if self.encode:
+                value = self.encode(value)
+            getattr(patron.park, self.array_name)[patron.idx] = value
+
+
+class PathHistory:
+    """
+    Fixed-size ring buffer of recent (x, y) positions.
+    
+    Appending overwrites the oldest point once full, so recording a
+    position never shifts or allocates.
+    """
+    
+    def __init__(self, max_length):
+        """Initialize an empty history holding up to max_length points."""
+        self._points = np.empty((max_length, 2), dtype=np.float32)
+        self._head = 0
+        self._length = 0
+    
+    def append(self, point):
+        """Record a position, dropping the oldest one when full."""
+        self._points[self._head] = point
+        self._head = (self._head + 1) % len(self._points)
+        self._length = min(self._length + 1, len(self._points))
+    
+    def points(self):
+        """
+        Get the recorded positions, oldest first.
+        
+        Returns:
+            np.ndarray: (n, 2) array of positions
+        """
+        if self._length < len(self._points):
+            return self._points[:self._length]
+        return np.concatenate((self._points[self._head:], self._points[:self._head]))
+    
+    def __len__(self):
+        return self._length
+    
+    def __iter__(self):
+        return (tuple(point) for point in self.points())
+    
+    def __contains__(self, point):
+        return bool((self.points() == point).all(axis=1).any())
 
 
 class Patron:
     """Represents a visitor with intelligent ride-seeking behavior."""
     
-    def __init__(self, patron_id, x, y, name=None, personality="balanced"):
+    # No per-instance __dict__; the underscored names hold ParkColumn
+    # values while the patron is not in a park
+    __slots__ = ('park', 'idx', 'id', 'name', 'target_ride', 'queue_ticket',
+                 'personality', 'desired_rides', 'patience', 'adventure_level',
+                 'visited_rides', 'rides_completed', '_current_target',
+                 'max_history', 'path_history',
+                 '_x', '_y', '_state', '_move_speed', '_immobile_timer',
+                 '_time_in_park', '_time_queuing', '_time_riding',
+                 '_time_roaming', '_target_id')
+    
+    x = ParkColumn()
+    y = ParkColumn()
+    state = ParkColumn(decode=PATRON_STATES.__getitem__)
+    move_speed = ParkColumn()
+    immobile_timer = ParkColumn()
+    time_in_park = ParkColumn()
+    time_queuing = ParkColumn()
+    time_riding = ParkColumn()
+    time_roaming = ParkColumn()
+    target_id = ParkColumn()
+    
+    def __init__(self, patron_id, x, y, name=None, personality="balanced", traits=None):
         """Initialize a patron with personality-based behavior."""
+        # Park row this patron's array-backed attributes live in
+        self.park = None
+        self.idx = None
+        
         self.id = patron_id
         self.name = name if name else f"Patron_{patron_id}"
         self.x = x
         self.y = y
         self.state = PatronState.ROAMING
         self.target_ride = None
+        self.queue_ticket = None  # Place in target_ride's queue numbering
         self.immobile_timer = DEFAULT_PATRON_IMMOBILE_TIME
         
         # Personality system - NEW!
         self.personality = personality
         
-        # Set attributes based on personality
-        if personality == "thrill_seeker":
-            self.desired_rides = random.randint(4, 6)  # Wants more rides
-            self.move_speed = DEFAULT_PATRON_MOVE_SPEED * 1.3  # Faster movement
-            self.patience = random.randint(15, 25)  # More patient in queues
-        elif personality == "casual":
-            self.desired_rides = random.randint(1, 3)  # Fewer rides
-            self.move_speed = DEFAULT_PATRON_MOVE_SPEED * 0.8  # Slower movement
-            self.patience = random.randint(3, 8)  # Less patient
-        else:  # balanced
-            self.desired_rides = random.randint(2, 4)
-            self.move_speed = DEFAULT_PATRON_MOVE_SPEED + random.uniform(-0.1, 0.15)
-            self.patience = random.randint(5, 15)
+        # Set attributes based on personality (drawn in bulk by
+        # Park.spawn_patrons, or just for this patron)
+        if traits is None:
+            traits = {name: values[0] for name, values
+                      in draw_personality_traits([personality]).items()}
+        self.desired_rides = int(traits['desired_rides'])
+        self.move_speed = float(traits['move_speed'])
+        self.patience = int(traits['patience'])
         
         # Smart visiting system
         self.visited_rides = set()  # Track which rides visited
@@ -45,8 +213,9 @@ class Patron:
         self.current_target = None  # Specific ride heading to
         
         # Path visualization
-        self.path_history = [(x, y)]
         self.max_history = 30
+        self.path_history = PathHistory(self.max_history)
+        self.path_history.append((x, y))
         
         # Statistics
         self.time_in_park = 0
@@ -55,40 +224,45 @@ class Patron:
         self.time_roaming = 0
         
         # Additional personality trait
-        self.adventure_level = random.random()
-        
+        self.adventure_level = float(traits['adventure_level'])
+    
+    @property
+    def current_target(self):
+        """Specific ride heading to; its id is mirrored in the target_id column."""
+        return self._current_target
+    
+    @current_target.setter
+    def current_target(self, ride):
+        self._current_target = ride
+        self.target_id = -1 if ride is None or ride.id is None else ride.id
+    
     def step_change(self, park):
         """Update patron behavior for one timestep."""
-        self.time_in_park += 1
-        
-        if self.state == PatronState.QUEUING:
-            self.time_queuing += 1
-        elif self.state == PatronState.RIDING:
-            self.time_riding += 1
-        elif self.state == PatronState.ROAMING:
-            self.time_roaming += 1
+        if self.park is not park:
+            raise ValueError(f"Patron {self.id} is not in this park; "
+                             f"add it with park.add_patron() first")
+        park.step_patrons(np.array([self.idx]))
+    
+    def record_position(self):
+        """Append the current position to the path history."""
+        self.path_history.append((self.x, self.y))
+    
+    def plan_roam(self, park):
+        """
+        Make this timestep's roaming decision.
         
-        if self.immobile_timer > 0:
-            self.immobile_timer -= 1
-            return
+        Decides whether to head for the exit and picks a ride to visit. The
+        distance check, queue joining and the step itself are applied to all
+        roaming patrons at once by Park.step_patrons.
         
-        if self.state == PatronState.ROAMING:
-            self.intelligent_roam(park)
-        elif self.state == PatronState.QUEUING:
-            self.check_queue_patience(park)
-        elif self.state == PatronState.RIDING:
-            pass  # Enjoying the ride
-        elif self.state == PatronState.EXITING:
-            self.move_to_exit(park)
+        Parameters:
+            park (Park): The park the patron is in
+            
+        Returns:
+            Ride: Ride to walk toward, or None to wander randomly
+        """
+        rolls = park.tick_rolls[self.idx]
         
-        # Update path history
-        if self.state in [PatronState.ROAMING, PatronState.EXITING]:
-            self.path_history.append((self.x, self.y))
-            if len(self.path_history) > self.max_history:
-                self.path_history.pop(0)
-    
-    def intelligent_roam(self, park):
-        """Smart roaming that visits all rides."""
         # FIXED: Check if completed enough rides and ready to exit
         if self.rides_completed >= self.desired_rides:
             # Exit chance varies by personality
@@ -99,88 +273,66 @@ class Patron:
             else:
                 exit_chance = 0.08  # Balanced
             
-            if random.random() < exit_chance:
+            if rolls[ROLL_EXIT] < exit_chance:
                 self.state = PatronState.EXITING
                 self.current_target = None
-                return
-        
-        # Find unvisited rides
-        unvisited_rides = [r for r in park.rides if r not in self.visited_rides]
+                return None
         
         # If no target, pick a new one
-        if self.current_target is None or self.current_target in self.visited_rides:
+        target = self.current_target
+        if target is None or target in self.visited_rides:
+            # Find unvisited rides (only needed when choosing)
+            unvisited_rides = [r for r in park.rides if r not in self.visited_rides]
             if unvisited_rides:
                 # Prefer unvisited rides
-                self.current_target = random.choice(unvisited_rides)
+                self.current_target = unvisited_rides[
+                    int(rolls[ROLL_PICK] * len(unvisited_rides))]
             elif park.rides:
                 # If visited all, pick a favorite to revisit
-                self.current_target = random.choice(park.rides)
+                self.current_target = park.rides[
+                    int(rolls[ROLL_PICK] * len(park.rides))]
         
-        # Move toward current target
-        if self.current_target:
-            dx = self.current_target.x - self.x
-            dy = self.current_target.y - self.y
-            distance = math.sqrt(dx**2 + dy**2)
-            
-            # If close enough, try to join queue
-            if distance < 15:
-                queue_size = len(self.current_target.queue)
-                
-                # Queue tolerance varies by personality
-                if self.personality == "thrill_seeker":
-                    max_acceptable_queue = self.current_target.capacity * 3
-                elif self.personality == "casual":
-                    max_acceptable_queue = self.current_target.capacity * 1.5
-                else:
-                    max_acceptable_queue = self.current_target.capacity * 2
-                
-                # More likely to join if haven't visited this ride
-                join_chance = 0.5 if self.current_target not in self.visited_rides else 0.3
-                
-                if queue_size < max_acceptable_queue and random.random() < join_chance:
-                    self.current_target.add_to_queue(self)
-                    return
-            
-            # Calculate movement with some wandering
-            if distance > 1:
-                angle_to_target = math.atan2(dy, dx)
-                wander = random.uniform(-0.3, 0.3)
-                angle = angle_to_target + wander
-                
-                new_x = self.x + self.move_speed * math.cos(angle)
-                new_y = self.y + self.move_speed * math.sin(angle)
-                
-                if park.is_valid_position(new_x, new_y):
-                    self.x = new_x
-                    self.y = new_y
-                else:
-                    # If blocked, try random direction
-                    angle = random.uniform(0, 2 * math.pi)
-                    new_x = self.x + self.move_speed * math.cos(angle)
-                    new_y = self.y + self.move_speed * math.sin(angle)
-                    if park.is_valid_position(new_x, new_y):
-                        self.x = new_x
-                        self.y = new_y
+        return self.current_target
+    
+    def try_join_queue(self, queue_size, capacity):
+        """
+        Try to join the queue of the target ride (called once close to it).
+        
+        Parameters:
+            queue_size (int): Current length of the target ride's queue
+            capacity (int): Capacity of the target ride
+        
+        Returns:
+            bool: True if the patron joined the queue
+        """
+        # Queue tolerance varies by personality
+        if self.personality == "thrill_seeker":
+            max_acceptable_queue = capacity * 3
+        elif self.personality == "casual":
+            max_acceptable_queue = capacity * 1.5
         else:
-            # Random walk if no target
-            angle = random.uniform(0, 2 * math.pi)
-            new_x = self.x + self.move_speed * math.cos(angle)
-            new_y = self.y + self.move_speed * math.sin(angle)
-            
-            if park.is_valid_position(new_x, new_y):
-                self.x = new_x
-                self.y = new_y
+            max_acceptable_queue = capacity * 2
+        
+        # More likely to join if haven't visited this ride
+        join_chance = 0.5 if self.current_target not in self.visited_rides else 0.3
+        
+        if (queue_size < max_acceptable_queue and
+                self.park.tick_rolls[self.idx, ROLL_JOIN] < join_chance):
+            self.current_target.add_to_queue(self)
+            return True
+        return False
     
     def check_queue_patience(self, park):
         """Check if patron gets impatient in queue."""
-        for ride in park.rides:
-            if self in ride.queue:
-                queue_position = list(ride.queue).index(self)
-                if queue_position > self.patience and random.random() < 0.05:
-                    ride.queue.remove(self)
-                    self.state = PatronState.ROAMING
-                    self.current_target = None
-                break
+        ride = self.target_ride
+        if ride is None or self.queue_ticket is None:
+            return
+        
+        if (ride.queue_position(self) > self.patience and
+                park.tick_rolls[self.idx, ROLL_PATIENCE] < 0.05):
+            ride.remove_from_queue(self)
+            self.state = PatronState.ROAMING
+            self.current_target = None
     
     def mark_ride_completed(self, ride):
         """
@@ -195,69 +347,22 @@ class Patron:
         
         # Debug output
         if self.rides_completed == 1:
-            print(f"  👤 Patron {self.id} ({self.personality}) completed first ride! ({self.rides_completed}/{self.desired_rides})")
+            logger.debug("  👤 Patron %s (%s) completed first ride! (%d/%d)",
+                         self.id, self.personality, self.rides_completed, self.desired_rides)
     
     def move_to_exit(self, park):
-        """Move patron toward nearest exit."""
-        if len(park.exits) > 0:
-            nearest_exit = min(park.exits, key=lambda e: 
-                             math.sqrt((self.x - e[0])**2 + (self.y - e[1])**2))
-            
-            dx = nearest_exit[0] - self.x
-            dy = nearest_exit[1] - self.y
-            distance = math.sqrt(dx**2 + dy**2)
-            
-            if distance < 2:
-                # Debug output
-                print(f"  👋 Patron {self.id} ({self.personality}) exiting after {self.rides_completed} rides!")
-                park.remove_patron(self)
-            else:
-                self.x += self.move_speed * dx / distance
-                self.y += self.move_speed * dy / distance
-    
-    def plot(self, ax):
-        """Plot the patron with enhanced visuals."""
-        # Draw movement trail with gradient
-        if len(self.path_history) > 1 and self.state == PatronState.ROAMING:
-            for i in range(len(self.path_history) - 1):
-                alpha = (i + 1) / len(self.path_history) * 0.4
-                color = 'green' if self.current_target else 'gray'
-                ax.plot([self.path_history[i][0], self.path_history[i+1][0]],
-                       [self.path_history[i][1], self.path_history[i+1][1]],
-                       color=color, alpha=alpha, linewidth=1)
-        
-        # Draw line to target ride
-        if self.current_target and self.state == PatronState.ROAMING:
-            ax.plot([self.x, self.current_target.x], [self.y, self.current_target.y],
-                   'g--', alpha=0.2, linewidth=0.5)
-        
-        # Plot patron with state-specific appearance
-        if self.state == PatronState.ROAMING:
-            color = 'limegreen' if self.current_target else 'yellowgreen'
-            ax.plot(self.x, self.y, 'o', color=color, markersize=7, 
-                   markeredgecolor='darkgreen', markeredgewidth=1.5, 
-                   label='Roaming', zorder=5)
-            
-        elif self.state == PatronState.EXITING:
-            ax.plot(self.x, self.y, 's', color='orange', markersize=7,
-                   markeredgecolor='darkorange', markeredgewidth=1.5, 
-                   label='Exiting', zorder=5)
-            
-        elif self.state == PatronState.QUEUING:
-            ax.plot(self.x, self.y, '^', color='dodgerblue', markersize=8,
-                   markeredgecolor='navy', markeredgewidth=1.5, 
-                   label='Queuing', zorder=5)
-            
-        elif self.state == PatronState.RIDING:
-            ax.plot(self.x, self.y, '*', color='gold', markersize=12,
-                   markeredgecolor='orange', markeredgewidth=2, 
-                   label='Riding', zorder=5)
+        """Move patron toward nearest exit (batched by Park._move_exiting)."""
+        if self.park is park:
+            park._move_exiting(np.array([self.idx]))
+            return
         
-        # Show completed rides count as small number
-        if self.state in [PatronState.ROAMING, PatronState.EXITING]:
-            if self.rides_completed > 0:
-                ax.text(self.x, self.y + 1.2, str(self.rides_completed), 
-                       fontsize=7, ha='center', weight='bold',
-                       color='white', 
-                       bbox=dict(boxstyle='circle', facecolor='green', 
-                                alpha=0.8, pad=0.2))
\ No newline at end of file
+        # Not one of the park's rows: walk it there one step at a time
+        nearest_exit = park.nearest_exit(self.x, self.y)
+        if nearest_exit is None:
+            return
+        dx = nearest_exit[0] - self.x
+        dy = nearest_exit[1] - self.y
+        distance = math.hypot(dx, dy)
+        if distance >= 2:
+            self.x += self.move_speed * dx / distance
+            self.y += self.move_speed * dy / distance
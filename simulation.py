@@ -3,16 +3,49 @@ simulation.py
 Enhanced simulation engine with real-time statistics and time of day effects.
 """
 
+import contextlib
+import heapq
+import itertools
+import multiprocessing
+import os
 import random
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
-from config import DEFAULT_MAX_TIMESTEPS, DEFAULT_SPAWN_RATE, PatronState, RideState
+import numpy as np
+from config import DEFAULT_MAX_TIMESTEPS, DEFAULT_SPAWN_RATE, SPAWN_GAP_BATCH, SLOWDOWN_BATCH_TICKS, PatronState, RideState
+
+
+# Info panel text, filled in by Simulation.plot_info_panel
+_INFO_TEMPLATE = """\
+═══ PARK STATISTICS ═══
+
+Time: {time_of_day} {emoji}
+Timestep: {timestep}/{max_timesteps}
+Spawn Rate: {spawn_rate:.2f}
+
+PATRONS:
+  • In Park: {in_park}
+  • Total Spawned: {spawned}
+  • Total Exited: {exited}
+
+PATRON STATES:
+  • Roaming: {roaming}
+  • Queuing: {queuing}
+  • Riding: {riding}
+  • Exiting: {exiting}
+
+RIDES:"""
+
+_RIDE_INFO_TEMPLATE = """\
+  {name}:
+    Queue: {queued} | Riding: {riding}/{capacity}
+    State: {state}
+    Served: {served} | Cycles: {cycles}"""
 
 
 class Simulation:
     """Main simulation engine with enhanced visualization and time of day effects."""
     
-    def __init__(self, park, max_timesteps=DEFAULT_MAX_TIMESTEPS, spawn_rate=DEFAULT_SPAWN_RATE, time_of_day="afternoon"):
+    def __init__(self, park, max_timesteps=DEFAULT_MAX_TIMESTEPS, spawn_rate=DEFAULT_SPAWN_RATE, time_of_day="afternoon",
+                 verbose=True, log_every=50, record_every=None, seed=None):
         """
         Initialize the simulation with time of day effects.
         
@@ -21,9 +54,20 @@ class Simulation:
             max_timesteps (int): Maximum number of timesteps to run
             spawn_rate (float): Base probability of spawning patron per timestep
             time_of_day (str): Time period - 'morning', 'afternoon', 'evening', 'night'
+            verbose (bool): Print the setup summary and progress lines
+            log_every (int): Timesteps between progress lines, 0 for none
+            record_every (int): Timesteps between recorded statistics
+                samples, 0 to record none. By default run() records once per
+                frame when interactive and nothing otherwise, while advance()
+                on its own records every timestep
+            seed (int): Seed for the simulation's NumPy generator; by
+                default it is drawn from the random module
         """
         self.park = park
         self.max_timesteps = max_timesteps
+        self.verbose = verbose
+        self.log_every = log_every if verbose else 0
+        self.record_every = record_every
         self.base_spawn_rate = spawn_rate
         self.time_of_day = time_of_day
         self.current_timestep = 0
@@ -59,7 +103,7 @@ class Simulation:
         
         # Apply time effects
         current_effects = self.time_effects.get(time_of_day, self.time_effects['afternoon'])
-        self.spawn_rate = spawn_rate * current_effects['spawn_multiplier']
+        self._spawn_rate = spawn_rate * current_effects['spawn_multiplier']
         self.ride_speed_multiplier = current_effects['ride_speed']
         self.time_description = current_effects['description']
         self.time_emoji = current_effects['emoji']
@@ -67,53 +111,189 @@ class Simulation:
         self.total_patrons_spawned = 0
         self.total_patrons_exited = 0
         
-        # Track statistics over time
-        self.patron_counts = []
-        self.queue_lengths = []
-        self.timesteps_recorded = []
+        # Vectorized random draws; unless a seed is given, seeded from the
+        # random module. Park seeds its generator the same way, so
+        # random.seed() before building both reproduces a run
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.rng = np.random.default_rng(seed)
+        
+        # Arrival gaps drawn ahead, next one last
+        self._spawn_gaps = []
+        
+        # Events due at a timestep, as a heap of (timestep, seq, callback)
+        self.events = []
+        self._event_seq = itertools.count()
+        self._schedule_spawn(self.current_timestep - 1)
+        
+        # Track statistics over time in preallocated buffers; patron_counts,
+        # queue_lengths and timesteps_recorded are views of the filled part
+        self._stat_count = 0
+        samples = max_timesteps // record_every if record_every else 0
+        self._patron_counts = np.zeros(max(samples, 1), dtype=np.int32)
+        self._queue_lengths = np.zeros_like(self._patron_counts)
+        self._timesteps = np.zeros_like(self._patron_counts)
+        
+        # Persistent artists of the statistics graph and info panel
+        self._stats_artists = None
+        self._info_artist = None
         
         # Display time of day effects
-        print(f"\n⏰ {self.time_description}")
-        print(f"   Base spawn rate: {spawn_rate:.2f}")
-        print(f"   Adjusted spawn rate: {self.spawn_rate:.2f} ({current_effects['spawn_multiplier']}x)")
-        print(f"   Ride speed: {self.ride_speed_multiplier * 100:.0f}%\n")
+        if verbose:
+            print(f"\n⏰ {self.time_description}")
+            print(f"   Base spawn rate: {spawn_rate:.2f}")
+            print(f"   Adjusted spawn rate: {self.spawn_rate:.2f} ({current_effects['spawn_multiplier']}x)")
+            print(f"   Ride speed: {self.ride_speed_multiplier * 100:.0f}%\n")
+    
+    @property
+    def spawn_rate(self):
+        """Probability of a patron arriving each timestep, after time of day effects."""
+        return self._spawn_rate
+    
+    @spawn_rate.setter
+    def spawn_rate(self, rate):
+        # The next arrival and any gaps drawn ahead used the old rate;
+        # arrivals are memoryless, so drop them and draw from this timestep
+        self._spawn_rate = rate
+        self._spawn_gaps = []
+        self.events[:] = [event for event in self.events if event[2] != self._spawn]
+        heapq.heapify(self.events)
+        self._schedule_spawn(self.current_timestep - 1)
+    
+    @property
+    def patron_counts(self):
+        """Patrons in the park after each recorded timestep."""
+        return self._patron_counts[:self._stat_count]
+    
+    @property
+    def queue_lengths(self):
+        """Total queue length after each recorded timestep."""
+        return self._queue_lengths[:self._stat_count]
+    
+    @property
+    def timesteps_recorded(self):
+        """Timestep number of each recorded entry."""
+        return self._timesteps[:self._stat_count]
+    
+    def _reserve_statistics(self, size):
+        """Make sure the statistics buffers can hold size entries."""
+        capacity = len(self._timesteps)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in ('_patron_counts', '_queue_lengths', '_timesteps'):
+            buffer = np.zeros(capacity, dtype=np.int32)
+            buffer[:self._stat_count] = getattr(self, name)[:self._stat_count]
+            setattr(self, name, buffer)
+    
+    def schedule(self, timestep, callback):
+        """
+        Queue a callback to run at the start of a timestep.
+        
+        Parameters:
+            timestep (int): Timestep to run at
+            callback (callable): Function taking no arguments
+        """
+        heapq.heappush(self.events, (timestep, next(self._event_seq), callback))
+    
+    def _schedule_spawn(self, after):
+        """
+        Schedule the next patron arrival after a timestep.
+        
+        Each timestep spawns with probability spawn_rate, so the gap to
+        the next arrival is geometric and can be drawn in one go instead of
+        rolling every tick. Gaps are drawn SPAWN_GAP_BATCH at a time.
+        
+        Parameters:
+            after (int): Timestep of the previous arrival
+        """
+        if self.spawn_rate <= 0:
+            return
+        if not self._spawn_gaps:
+            gaps = self.rng.geometric(min(self.spawn_rate, 1.0), SPAWN_GAP_BATCH)
+            self._spawn_gaps = gaps[::-1].tolist()
+        self.schedule(after + self._spawn_gaps.pop(), self._spawn)
+    
+    def _spawn(self):
+        """Spawn one patron and schedule the next arrival."""
+        self.park.spawn_patron(self.next_patron_id)
+        self.next_patron_id += 1
+        self.total_patrons_spawned += 1
+        self._schedule_spawn(self.current_timestep)
     
     def step(self):
         """Execute one timestep of the simulation with time of day effects."""
-        # Spawn new patrons (uses adjusted spawn_rate)
-        if random.random() < self.spawn_rate:
-            self.park.spawn_patron(self.next_patron_id)
-            self.next_patron_id += 1
-            self.total_patrons_spawned += 1
-        
-        # Update all patrons
-        initial_patron_count = len(self.park.patrons)
-        for patron in self.park.patrons[:]:
-            patron.step_change(self.park)
-        
-        # Track exits
-        patrons_exited = initial_patron_count - len(self.park.patrons)
-        self.total_patrons_exited += patrons_exited
-        
-        # Update all rides with time of day effects
-        for ride in self.park.rides:
-            # Apply ride speed multiplier for evening/night
-            if self.ride_speed_multiplier < 1.0:
-                # Slow down rides at evening/night
-                if ride.state == RideState.RUNNING and ride.timer > 1:
-                    # Randomly add extra time to simulate slower operation
-                    if random.random() > self.ride_speed_multiplier:
-                        ride.timer += 1  # Makes ride take longer
-            
-            ride.step_change()
+        self.advance(1)
+    
+    def advance(self, n_ticks):
+        """
+        Execute several timesteps back to back with no drawing in between.
         
-        self.current_timestep += 1
+        The tick loop runs here, with the park, its rides, the batch
+        patron update and the other per-tick lookups bound to locals once
+        for all the ticks.
         
-        # Record statistics
-        self.patron_counts.append(len(self.park.patrons))
-        total_queue = sum(len(ride.queue) for ride in self.park.rides)
-        self.queue_lengths.append(total_queue)
-        self.timesteps_recorded.append(self.current_timestep)
+        Parameters:
+            n_ticks (int): Number of timesteps to run
+        """
+        record_every = 1 if self.record_every is None else self.record_every
+        if record_every:
+            self._reserve_statistics(self._stat_count + n_ticks // record_every + 1)
+        patron_counts = self._patron_counts
+        queue_lengths = self._queue_lengths
+        timesteps = self._timesteps
+        
+        park = self.park
+        rides = park.rides
+        ride_ticks = park._ride_tick_fns
+        patrons = park.patrons
+        step_patrons = park.step_patrons
+        events = self.events
+        heappop = heapq.heappop
+        compress = itertools.compress
+        running = RideState.RUNNING
+        ride_speed = self.ride_speed_multiplier
+        
+        # Evening/night: each draw decides, for up to SLOWDOWN_BATCH_TICKS
+        # ticks and every ride, whether a running ride loses time
+        slow_rides = ride_speed < 1.0 and bool(rides)
+        slowdowns = None
+        
+        for tick in range(n_ticks):
+            # Run events due now (patron arrivals at the adjusted spawn_rate)
+            timestep = self.current_timestep
+            while events and events[0][0] <= timestep:
+                heappop(events)[2]()
+            
+            # Update all patrons in one batch, which also drops those who left
+            self.total_patrons_exited += step_patrons()
+            
+            # Update all rides with time of day effects
+            if slow_rides:
+                row = tick % SLOWDOWN_BATCH_TICKS
+                if row == 0:
+                    block = min(SLOWDOWN_BATCH_TICKS, n_ticks - tick)
+                    slowdowns = self.rng.random((block, len(rides))) > ride_speed
+                
+                # Randomly add extra time to simulate slower operation,
+                # visiting only the rides whose draw came up slow
+                for ride in compress(rides, slowdowns[row].tolist()):
+                    if ride.state == running and ride.timer > 1:
+                        ride.timer += 1  # Makes ride take longer
+            
+            for tick_ride in ride_ticks:
+                tick_ride()
+            
+            timestep += 1
+            self.current_timestep = timestep
+            
+            # Record statistics
+            if record_every and timestep % record_every == 0:
+                i = self._stat_count
+                patron_counts[i] = len(patrons)
+                queue_lengths[i] = park.total_queue_len
+                timesteps[i] = timestep
+                self._stat_count = i + 1
     
     def run(self, interactive=False, plot_interval=5):
         """
@@ -126,7 +306,16 @@ class Simulation:
         Returns:
             dict: Simulation statistics
         """
+        # Only the live statistics graph reads the samples, once per frame
+        if self.record_every is None:
+            self.record_every = plot_interval if interactive else 0
+        
         if interactive:
+            # pyplot (and its GUI backend) is only loaded for live runs, so
+            # batch runs and sweep workers never start one
+            import matplotlib.pyplot as plt
+            from matplotlib.gridspec import GridSpec
+            
             plt.ion()
             fig = plt.figure(figsize=(24, 14))  # PERFECT SPACING figure
             gs = GridSpec(2, 2, figure=fig, height_ratios=[3, 1], hspace=0.3, wspace=0.3)
@@ -137,7 +326,14 @@ class Simulation:
             ax_info.axis('off')
         
         while self.current_timestep < self.max_timesteps:
-            self.step()
+            # Run straight through to the next frame or console update
+            timestep = self.current_timestep
+            next_stop = self.max_timesteps
+            if self.log_every:
+                next_stop = min(next_stop, (timestep // self.log_every + 1) * self.log_every)
+            if interactive:
+                next_stop = min(next_stop, (timestep // plot_interval + 1) * plot_interval)
+            self.advance(next_stop - timestep)
             
             if interactive and self.current_timestep % plot_interval == 0:
                 # Clear and update main park view
@@ -154,7 +350,7 @@ class Simulation:
                 plt.pause(0.01)
             
             # Console output
-            if self.current_timestep % 50 == 0:
+            if self.log_every and self.current_timestep % self.log_every == 0:
                 print(f"Timestep {self.current_timestep}: "
                       f"{len(self.park.patrons)} in park, "
                       f"{self.total_patrons_spawned} spawned, "
@@ -171,16 +367,16 @@ class Simulation:
         """
         Plot real-time statistics graph.
         
+        The lines, labels and legend are created on the first call for an
+        axes; later calls only swap in the new data.
+        
         Parameters:
             ax: Matplotlib axes for statistics
         """
-        ax.clear()
-        
-        if len(self.timesteps_recorded) > 1:
-            ax.plot(self.timesteps_recorded, self.patron_counts, 'b-', 
-                   linewidth=2, label='Patrons in Park')
-            ax.plot(self.timesteps_recorded, self.queue_lengths, 'r-', 
-                   linewidth=2, label='Total Queue Length')
+        if self._stats_artists is None or self._stats_artists[0].axes is not ax:
+            ax.clear()
+            patron_line, = ax.plot([], [], 'b-', linewidth=2, label='Patrons in Park')
+            queue_line, = ax.plot([], [], 'r-', linewidth=2, label='Total Queue Length')
             
             ax.set_xlabel('Timestep', fontsize=10)
             ax.set_ylabel('Count', fontsize=10)
@@ -188,6 +384,14 @@ class Simulation:
                         fontsize=11, weight='bold')
             ax.legend(loc='upper left', fontsize=9)
             ax.grid(True, alpha=0.3)
+            self._stats_artists = (patron_line, queue_line)
+        
+        patron_line, queue_line = self._stats_artists
+        patron_line.set_data(self.timesteps_recorded, self.patron_counts)
+        queue_line.set_data(self.timesteps_recorded, self.queue_lengths)
+        if len(self.timesteps_recorded) > 1:
+            ax.relim()
+            ax.autoscale_view()
     
     def plot_info_panel(self, ax):
         """
@@ -196,49 +400,38 @@ class Simulation:
         Parameters:
             ax: Matplotlib axes for info panel
         """
-        ax.clear()
-        ax.axis('off')
-        
         # Get patron state counts
-        state_counts = {state: 0 for state in PatronState}
-        for patron in self.park.patrons:
-            state_counts[patron.state] += 1
-        
-        # Build info text
-        info_lines = [
-            "═══ PARK STATISTICS ═══",
-            f"",
-            f"Time: {self.time_of_day.upper()} {self.time_emoji}",
-            f"Timestep: {self.current_timestep}/{self.max_timesteps}",
-            f"Spawn Rate: {self.spawn_rate:.2f}",
-            f"",
-            f"PATRONS:",
-            f"  • In Park: {len(self.park.patrons)}",
-            f"  • Total Spawned: {self.total_patrons_spawned}",
-            f"  • Total Exited: {self.total_patrons_exited}",
-            f"",
-            f"PATRON STATES:",
-            f"  • Roaming: {state_counts[PatronState.ROAMING]}",
-            f"  • Queuing: {state_counts[PatronState.QUEUING]}",
-            f"  • Riding: {state_counts[PatronState.RIDING]}",
-            f"  • Exiting: {state_counts[PatronState.EXITING]}",
-            f"",
-            f"RIDES:",
-        ]
+        state_counts = self.park.state_counts()
         
-        for ride in self.park.rides:
-            info_lines.append(f"  {ride.name}:")
-            info_lines.append(f"    Queue: {len(ride.queue)} | "
-                            f"Riding: {len(ride.riders)}/{ride.capacity}")
-            info_lines.append(f"    State: {ride.state.value.upper()}")
-            info_lines.append(f"    Served: {ride.total_riders_served} | "
-                            f"Cycles: {ride.total_cycles}")
-        
-        # Display text
-        info_text = '\n'.join(info_lines)
-        ax.text(0.05, 0.95, info_text, transform=ax.transAxes,
-               fontsize=9, verticalalignment='top', family='monospace',
-               bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+        # Fill the info text templates once per frame
+        ride_text = '\n'.join(
+            _RIDE_INFO_TEMPLATE.format(
+                name=ride.name, queued=len(ride.queue), riding=len(ride.riders),
+                capacity=ride.capacity, state=ride.state.name,
+                served=ride.total_riders_served, cycles=ride.total_cycles)
+            for ride in self.park.rides)
+        info_text = _INFO_TEMPLATE.format(
+            time_of_day=self.time_of_day.upper(), emoji=self.time_emoji,
+            timestep=self.current_timestep, max_timesteps=self.max_timesteps,
+            spawn_rate=self.spawn_rate, in_park=len(self.park.patrons),
+            spawned=self.total_patrons_spawned, exited=self.total_patrons_exited,
+            roaming=state_counts[PatronState.ROAMING],
+            queuing=state_counts[PatronState.QUEUING],
+            riding=state_counts[PatronState.RIDING],
+            exiting=state_counts[PatronState.EXITING])
+        if ride_text:
+            info_text += '\n' + ride_text
+        
+        # Display text, reusing the panel's text artist after the first call
+        if self._info_artist is None or self._info_artist.axes is not ax:
+            ax.clear()
+            ax.axis('off')
+            self._info_artist = ax.text(
+                0.05, 0.95, info_text, transform=ax.transAxes,
+                fontsize=9, verticalalignment='top', family='monospace',
+                bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+        else:
+            self._info_artist.set_text(info_text)
     
     def get_statistics(self):
         """
@@ -247,7 +440,7 @@ class Simulation:
         Returns:
             dict: Dictionary of statistics
         """
-        total_queue_length = sum(len(ride.queue) for ride in self.park.rides)
+        total_queue_length = self.park.total_queue_len
         avg_queue_length = total_queue_length / len(self.park.rides) if self.park.rides else 0
         
         total_served = sum(ride.total_riders_served for ride in self.park.rides)
@@ -303,17 +496,80 @@ class Simulation:
         print("─"*60)
         
         for ride in self.park.rides:
-            print(f"\n  {ride.name}:")
-            print(f"    Current state: {ride.state.value.upper()}")
-            print(f"    Queue: {len(ride.queue)} patrons")
-            print(f"    Currently riding: {len(ride.riders)}/{ride.capacity}")
-            print(f"    Total served: {ride.total_riders_served}")
-            print(f"    Cycles completed: {ride.total_cycles}")
+            name, state, capacity = ride.name, ride.state.name, ride.capacity
+            queued, riding = len(ride.queue), len(ride.riders)
+            served, cycles = ride.total_riders_served, ride.total_cycles
+            lines = [
+                f"\n  {name}:",
+                f"    Current state: {state}",
+                f"    Queue: {queued} patrons",
+                f"    Currently riding: {riding}/{capacity}",
+                f"    Total served: {served}",
+                f"    Cycles completed: {cycles}",
+            ]
             
-            if ride.total_cycles > 0:
-                avg_riders_per_cycle = ride.total_riders_served / ride.total_cycles
-                efficiency = (avg_riders_per_cycle / ride.capacity) * 100
-                print(f"    Avg riders/cycle: {avg_riders_per_cycle:.1f}")
-                print(f"    Capacity efficiency: {efficiency:.1f}%")
+            if cycles > 0:
+                avg_riders_per_cycle = served / cycles
+                efficiency = (avg_riders_per_cycle / capacity) * 100
+                lines.append(f"    Avg riders/cycle: {avg_riders_per_cycle:.1f}")
+                lines.append(f"    Capacity efficiency: {efficiency:.1f}%")
+            print("\n".join(lines))
+        
+        print("\n" + "═"*60 + "\n")
+
+
+def _run_one(args):
+    """
+    Run one sweep entry in a worker process.
+    
+    Parameters:
+        args (tuple): (index, park factory, seed, Simulation keyword arguments)
         
-        print("\n" + "═"*60 + "\n")
\ No newline at end of file
+    Returns:
+        tuple: (index, statistics dict with the seed added)
+    """
+    index, park_factory, seed, kwargs = args
+    kwargs.setdefault('verbose', False)
+    random.seed(seed)
+    
+    # Independent streams for the park and the simulation from one seed
+    park_seed, sim_seed = np.random.SeedSequence(seed).spawn(2)
+    kwargs['seed'] = sim_seed
+    
+    # Workers run headless; their console chatter would only interleave
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        park = park_factory()
+        park.reseed(park_seed)
+        sim = Simulation(park, **kwargs)
+        stats = sim.run(interactive=False)
+    
+    stats['seed'] = seed
+    return index, stats
+
+
+def run_sweep(park_factory, param_grid, n_procs=None):
+    """
+    Run independent simulations for many parameter sets in parallel.
+    
+    Parameters:
+        park_factory (callable): Picklable function returning a fresh Park,
+            e.g. adventureworld.create_optimized_park
+        param_grid (list): Dicts of Simulation keyword arguments
+            (max_timesteps, spawn_rate, time_of_day); an optional 'seed'
+            key fixes that run's random numbers, defaulting to its index
+        n_procs (int): Worker processes, defaults to the CPU count
+        
+    Returns:
+        list: Statistics dict of each run, in param_grid order
+    """
+    args = []
+    for index, params in enumerate(param_grid):
+        kwargs = dict(params)
+        seed = kwargs.pop('seed', index)
+        args.append((index, park_factory, seed, kwargs))
+    
+    results = [None] * len(args)
+    with multiprocessing.Pool(n_procs) as pool:
+        for index, stats in pool.imap_unordered(_run_one, args, chunksize=4):
+            results[index] = stats
+    return results
@@ -17,8 +17,10 @@ Run with: pytest test_adventureworld.py -v
 Run with coverage: pytest test_adventureworld.py --cov=. --cov-report=html
 """
 
+import logging
 import pytest
 import sys
+import numpy as np
 import os
 from unittest.mock import Mock, patch, MagicMock
 
@@ -26,10 +28,11 @@ from unittest.mock import Mock, patch, MagicMock
 from patron import Patron, PatronState
 from a import PirateShip, FerrisWheel, SpiderRide, RollerCoaster, Ride
 from park import Park, TerrainObject
-from simulation import Simulation
+from _patron_kernels import roam_step, step_in_direction, angle_index
+from simulation import Simulation, run_sweep
 from config import (
     RideState, DEFAULT_PARK_WIDTH, DEFAULT_PARK_HEIGHT,
-    DEFAULT_SPAWN_RATE, DEFAULT_MAX_TIMESTEPS
+    DEFAULT_SPAWN_RATE, DEFAULT_MAX_TIMESTEPS, SPAWN_GAP_BATCH, SLOWDOWN_BATCH_TICKS
 )
 
 
@@ -102,6 +105,17 @@ class TestPatron:
         # Thrill seekers are more patient
         assert thrill_seeker.patience > casual.patience
     
+    def test_random_seed_reproduces_patron_traits(self):
+        """Test that patrons built directly repeat their traits under random.seed()."""
+        import random
+        traits = []
+        for _ in range(2):
+            random.seed(3)
+            patron = Patron(1, 50, 60, personality="balanced")
+            traits.append((patron.desired_rides, patron.move_speed, patron.patience))
+
+        assert traits[0] == traits[1]
+    
     def test_patron_state_transitions(self, sample_patron):
         """Test patron state changes."""
         assert sample_patron.state == PatronState.ROAMING
@@ -135,6 +149,53 @@ class TestPatron:
         sample_patron.path_history.append((sample_patron.x, sample_patron.y))
         
         assert len(sample_patron.path_history) >= 2
+    
+    def test_first_ride_logged_at_debug_level(self, sample_patron, caplog, capsys):
+        """Test that per-patron progress goes to the debug log, not stdout."""
+        ride = PirateShip("Test", 100, 100, capacity=5, duration=10)
+        
+        with caplog.at_level(logging.DEBUG, logger="patron"):
+            sample_patron.mark_ride_completed(ride)
+        
+        assert "completed first ride" in caplog.text
+        assert "completed first ride" not in capsys.readouterr().out
+    
+    def test_path_history_keeps_latest_points(self, sample_patron):
+        """Test that the path history ring buffer drops the oldest points."""
+        for i in range(sample_patron.max_history + 5):
+            sample_patron.path_history.append((i, i))
+
+        points = sample_patron.path_history.points()
+        assert len(sample_patron.path_history) == sample_patron.max_history
+        assert tuple(points[0]) == (5, 5)
+        assert tuple(points[-1]) == (34, 34)
+        assert (100, 75) not in sample_patron.path_history
+    
+    def test_quantized_steps_keep_speed(self):
+        """Test that table-driven steps move patrons by their speed."""
+        x, y = np.zeros(3), np.zeros(3)
+        speed = np.full(3, 2.0)
+
+        new_x, new_y = step_in_direction(x, y, speed, angle_index([0, np.pi / 2, np.pi]))
+        np.testing.assert_allclose(new_x, [2, 0, -2], atol=1e-12)
+        np.testing.assert_allclose(new_y, [0, 2, 0], atol=1e-12)
+
+        new_x, new_y = roam_step(x, y, speed, np.full(3, 10.0), np.full(3, 5.0),
+                                 np.ones(3, dtype=bool), angle_index(np.zeros(3)),
+                                 np.zeros(3, dtype=np.int64))
+        np.testing.assert_allclose(np.hypot(new_x, new_y), 2)
+        np.testing.assert_allclose(new_y / new_x, 0.5)
+    
+    def test_model_objects_use_slots(self, park_with_rides):
+        """Test that patrons, rides and terrain carry no per-instance dict."""
+        patron = Patron(1, 100, 75, personality="balanced")
+        park_with_rides.add_patron(patron)
+        patron.current_target = park_with_rides.rides[0]
+        objects = [patron, Patron(2, 50, 50), TerrainObject(10, 10, 4, 4)]
+        objects += park_with_rides.rides + [RollerCoaster("Coaster", 100, 100)]
+        
+        for obj in objects:
+            assert not hasattr(obj, '__dict__')
 
 
 # ============================================================================
@@ -210,6 +271,26 @@ class TestRides:
         assert ride.state == RideState.RUNNING
         assert len(ride.riders) > 0
     
+    def test_load_patrons_boards_in_bulk(self, park_with_rides):
+        """Test that loading fills up to capacity for park and free-standing patrons."""
+        ride = park_with_rides.rides[0]
+        patrons = [Patron(i, ride.x, ride.y - 10, personality="balanced") for i in range(ride.capacity + 2)]
+        for patron in patrons[1:]:
+            park_with_rides.add_patron(patron)
+        for patron in patrons:
+            ride.add_to_queue(patron)
+        
+        ride.load_patrons()
+        
+        assert ride.riders == patrons[:ride.capacity]
+        assert list(ride.queue) == patrons[ride.capacity:]
+        assert park_with_rides.total_queue_len == 2
+        for patron in ride.riders:
+            assert patron.state == PatronState.RIDING
+            assert (patron.x, patron.y) == (ride.x, ride.y)
+            assert patron.queue_ticket is None
+        assert ride.queue_position(patrons[-1]) == 1
+    
     def test_ride_capacity_limit(self):
         """Test that rides respect capacity limits."""
         ride = PirateShip("Test", 100, 100, capacity=5, duration=10)
@@ -227,6 +308,20 @@ class TestRides:
         # Should only load up to capacity
         assert len(ride.riders) <= ride.capacity
     
+    def test_queue_position_tracks_queue(self):
+        """Test queue positions stay right through loading and leaving."""
+        ride = PirateShip("Test", 100, 100, capacity=2, duration=10)
+        patrons = [Patron(i, 100, 90, personality="balanced") for i in range(6)]
+        for patron in patrons:
+            ride.add_to_queue(patron)
+        
+        ride.load_patrons()
+        ride.remove_from_queue(patrons[3])
+        
+        assert patrons[3] not in ride.queue
+        for position, patron in enumerate(ride.queue):
+            assert ride.queue_position(patron) == position
+    
     def test_ride_overlap_detection(self):
         """Test that ride overlap detection works."""
         ride1 = PirateShip("Ride 1", 100, 100, capacity=10, duration=20)
@@ -252,6 +347,23 @@ class TestRides:
         
         assert ride.total_riders_served == initial_served + 3
     
+    def test_unload_scatter_is_reproducible(self):
+        """Test that unload scatter follows random.seed() alone, or the park's rng."""
+        import random
+        scatters = []
+        for park in (None, None, Park(seed=2), Park(seed=2)):
+            random.seed(8)
+            ride = PirateShip("Test", 100, 100, capacity=5, duration=10)
+            if park is not None:
+                park.add_ride(ride)
+            patrons = [Patron(i, 100, 90, personality="balanced") for i in range(3)]
+            ride.riders.extend(patrons)
+            ride.unload_patrons()
+            scatters.append([(p.x, p.y, p.immobile_timer) for p in patrons])
+        
+        assert scatters[0] == scatters[1]
+        assert scatters[2] == scatters[3]
+    
     def test_pirate_ship_animation(self):
         """Test that PirateShip updates its angle."""
         ride = PirateShip("Test", 100, 100, capacity=10, duration=20)
@@ -311,6 +423,44 @@ class TestPark:
         assert result2 == False
         assert len(empty_park.rides) == 1
     
+    def test_ride_tick_functions_follow_added_rides(self, empty_park):
+        """Test that the cached ride tick functions track rides as they are added."""
+        ship = PirateShip("Ship", 40, 100, capacity=10, duration=20)
+        clash = PirateShip("Clash", 42, 100, capacity=10, duration=20)
+        wheel = FerrisWheel("Wheel", 150, 100, capacity=8, duration=10)
+        for ride in (ship, clash, wheel):
+            empty_park.add_ride(ride)
+        
+        assert empty_park._ride_tick_fns == [ship.step_change, wheel.step_change]
+    
+    def test_overlaps_any_matches_pairwise_check(self, park_with_rides):
+        """Test that the array overlap check agrees with Ride.overlaps_with."""
+        for x in range(20, 270, 7):
+            for y in range(20, 190, 7):
+                probe = SpiderRide("Probe", x, y, capacity=12, duration=25)
+                expected = any(probe.overlaps_with(r) for r in park_with_rides.rides)
+                assert park_with_rides.overlaps_any(*probe.get_bounding_box()) == expected
+    
+    def test_add_ride_checks_float32_boxes(self, empty_park):
+        """Test that placement uses the float32 box array, buffer edge included."""
+        coaster = RollerCoaster("Coaster", 100, 100, capacity=8, duration=15)
+        ship = PirateShip("Ship", 40, 100, capacity=10, duration=20)
+        assert empty_park.add_ride(coaster) == True
+        assert empty_park.add_ride(ship) == True
+        assert empty_park._ride_bbox.dtype == np.float32
+        np.testing.assert_array_equal(empty_park._ride_bbox,
+                                      [coaster.get_bounding_box(), ship.get_bounding_box()])
+        
+        # Left edge exactly RIDE_OVERLAP_BUFFER past the coaster still clashes
+        clash = PirateShip("Clash", 120, 100, capacity=10, duration=20)
+        assert empty_park.add_ride(clash) == False
+        
+        # Just beyond the buffer is clear
+        clear = PirateShip("Clear", 120.5, 100, capacity=10, duration=20)
+        assert empty_park.add_ride(clear) == True
+        assert len(empty_park.rides) == 3
+        assert len(empty_park._ride_bbox) == 3
+    
     def test_optimal_ride_positions(self, empty_park):
         """Test that optimal positions are calculated correctly."""
         positions_1 = empty_park.get_optimal_ride_positions(1)
@@ -326,6 +476,17 @@ class TestPark:
             assert 0 < pos[0] < empty_park.width
             assert 0 < pos[1] < empty_park.height
     
+    def test_optimal_ride_positions_cached(self, empty_park):
+        """Test that repeated layout requests reuse the memoized result."""
+        first = empty_park.get_optimal_ride_positions(4)
+        first.append((0, 0))  # Callers get their own list to modify
+        hits_before = Park._layout.cache_info().hits
+
+        second = empty_park.get_optimal_ride_positions(4)
+
+        assert len(second) == 4
+        assert Park._layout.cache_info().hits == hits_before + 1
+    
     def test_patron_spawning(self, empty_park):
         """Test patron spawning."""
         initial_count = len(empty_park.patrons)
@@ -335,6 +496,18 @@ class TestPark:
         assert patron in empty_park.patrons
         assert patron.id == 1
     
+    def test_spawn_patrons_in_bulk(self, empty_park):
+        """Test spawning a group of patrons with one set of draws."""
+        empty_park.patron_strategy = 'thrill_seeker'
+        patrons = empty_park.spawn_patrons(10, 50)
+
+        assert len(empty_park.patrons) == 50
+        assert [p.id for p in patrons] == list(range(10, 60))
+        for patron in patrons:
+            assert patron.personality == 'thrill_seeker'
+            assert 4 <= patron.desired_rides <= 6
+            assert 15 <= patron.patience <= 25
+    
     def test_patron_removal(self, empty_park):
         """Test patron removal."""
         patron = empty_park.spawn_patron(1)
@@ -345,6 +518,264 @@ class TestPark:
         assert len(empty_park.patrons) == initial_count - 1
         assert patron not in empty_park.patrons
     
+    def test_patron_arrays_follow_patrons(self, empty_park):
+        """Test that patron attributes live in the park arrays while inside."""
+        first = Patron(1, 50, 60, personality="balanced")
+        second = Patron(2, 70, 80, personality="balanced")
+        empty_park.add_patron(first)
+        empty_park.add_patron(second)
+
+        second.x = 75
+        assert empty_park.patron_x[second.idx] == 75
+
+        # Removing a patron moves the last row into the freed slot
+        empty_park.remove_patron(first)
+        assert second.idx == 0
+        assert (second.x, second.y) == (75, 80)
+        assert (first.x, first.y) == (50, 60)
+        assert first.park is None
+    
+    def test_patron_records_survive_growth(self, empty_park):
+        """Test that the record array and its field views grow together."""
+        patrons = [Patron(i, 20 + i, 30, personality="balanced") for i in range(100)]
+        for patron in patrons:
+            empty_park.add_patron(patron)
+
+        assert len(empty_park.patrons_arr) >= 100
+        assert empty_park.patron_x.base is empty_park.patrons_arr
+        assert empty_park.patrons_arr[99]['x'] == 119
+        patrons[99].y = 42
+        assert empty_park.patrons_arr['y'][99] == 42
+    
+    def test_patron_coordinates_are_float32(self, empty_park):
+        """Test that positions and speeds are stored in single precision."""
+        patron = empty_park.spawn_patron(1)
+
+        for column in (empty_park.patron_x, empty_park.patron_y,
+                       empty_park.patron_move_speed):
+            assert column.dtype == np.float32
+        assert type(patron.x) is float
+        assert patron.path_history.points().dtype == np.float32
+    
+    def test_step_patrons_moves_roamers(self, empty_park):
+        """Test that a batch step moves roaming patrons and ticks timers."""
+        patrons = [Patron(i, 100, 75, personality="balanced") for i in range(5)]
+        for patron in patrons:
+            patron.immobile_timer = 0
+            empty_park.add_patron(patron)
+
+        empty_park.step_patrons()
+
+        for patron in patrons:
+            assert patron.time_in_park == 1
+            assert (patron.x, patron.y) != (100, 75)
+            assert empty_park.is_valid_position(patron.x, patron.y)
+    
+    def test_seeded_patron_steps_repeat(self):
+        """Test that patron decisions come from the park's seeded generator."""
+        runs = []
+        for _ in range(2):
+            park = Park(width=200, height=150, seed=7)
+            park.spawn_patrons(0, 10)
+            for _ in range(20):
+                park.step_patrons()
+            assert park.tick_rolls.shape == (10, 4)
+            runs.append((park.patron_x[:10].copy(), park.patron_y[:10].copy()))
+
+        np.testing.assert_array_equal(runs[0][0], runs[1][0])
+        np.testing.assert_array_equal(runs[0][1], runs[1][1])
+    
+    def test_single_patron_step_draws_only_its_rolls(self):
+        """Test that stepping one patron leaves the other rows' rolls alone."""
+        park = Park(width=200, height=150, seed=7)
+        patrons = park.spawn_patrons(0, 10)
+        park.step_patrons()
+        before = park.tick_rolls.copy()
+
+        patrons[3].step_change(park)
+        assert park.tick_rolls.shape == (10, 4)
+        assert not np.array_equal(park.tick_rolls[3], before[3])
+        np.testing.assert_array_equal(np.delete(park.tick_rolls, 3, axis=0),
+                                      np.delete(before, 3, axis=0))
+    
+    def test_random_seed_reproduces_a_run(self):
+        """Test that random.seed() alone makes a whole simulation repeat."""
+        import random
+        from adventureworld import create_optimized_park
+        served = []
+        for _ in range(2):
+            random.seed(0)
+            park = create_optimized_park(4)
+            sim = Simulation(park, max_timesteps=150, spawn_rate=0.5, verbose=False)
+            sim.run(interactive=False)
+            served.append([ride.total_riders_served for ride in park.rides])
+        
+        assert served[0] == served[1]
+        assert sum(served[0]) > 0
+    
+    def test_step_change_rejects_detached_patron(self, empty_park):
+        """Test that stepping a patron outside the park raises a clear error."""
+        patron = Patron(1, 100, 75, personality="balanced")
+        
+        with pytest.raises(ValueError, match="add_patron"):
+            patron.step_change(empty_park)
+    
+    def test_step_patrons_records_trails_by_state(self, empty_park):
+        """Test that roaming patrons leave trails and queuing ones don't."""
+        roamer = Patron(1, 100, 75, personality="balanced")
+        waiter = Patron(2, 120, 75, personality="balanced")
+        for patron in (roamer, waiter):
+            patron.immobile_timer = 0
+            empty_park.add_patron(patron)
+        waiter.state = PatronState.QUEUING
+
+        empty_park.step_patrons()
+
+        assert len(roamer.path_history) == 2
+        assert len(waiter.path_history) == 1
+    
+    def test_step_patrons_keeps_rows_in_place(self, empty_park):
+        """Test that a full step leaves every patron in its row."""
+        patrons = [Patron(i, 30 + 10 * i, 75, personality="balanced") for i in range(6)]
+        for i, patron in enumerate(patrons):
+            empty_park.add_patron(patron)
+            if i % 2:
+                patron.state = PatronState.RIDING
+
+        empty_park.step_patrons()
+
+        assert empty_park.patrons == patrons
+        for row, patron in enumerate(patrons):
+            assert patron.idx == row
+        assert [p.x for p in patrons if p.state == PatronState.RIDING] == [40, 60, 80]
+    
+    def test_exiting_patrons_leave_together(self, empty_park):
+        """Test that a batch exit step walks patrons and removes arrivals."""
+        exit_x, exit_y = empty_park.exits[0]
+        arriving = [Patron(i, exit_x + 1, exit_y, personality="balanced") for i in range(3)]
+        walker = Patron(9, exit_x + 10, exit_y, personality="balanced")
+        for patron in [arriving[0], walker] + arriving[1:]:
+            patron.state = PatronState.EXITING
+            empty_park.add_patron(patron)
+
+        empty_park._move_exiting(np.arange(len(empty_park.patrons)))
+
+        assert empty_park.patrons == [walker]
+        assert walker.idx == 0
+        assert walker.x == pytest.approx(exit_x + 10 - walker.move_speed, abs=1e-5)
+        assert all(patron.park is None for patron in arriving)
+    
+    def test_target_ride_mirrored_in_arrays(self, park_with_rides):
+        """Test that a patron's target ride id is kept in the patron arrays."""
+        patron = park_with_rides.spawn_patron(1)
+        ride = park_with_rides.rides[1]
+
+        patron.current_target = ride
+        assert park_with_rides.patron_target_id[patron.idx] == ride.id
+
+        patron.current_target = None
+        assert park_with_rides.patron_target_id[patron.idx] == -1
+    
+    def test_total_queue_len_tracks_queues(self, park_with_rides):
+        """Test that the park's queue total follows joins, loads and leaves."""
+        ride = park_with_rides.rides[0]
+        patrons = [Patron(i, 100, 90, personality="balanced") for i in range(ride.capacity + 3)]
+        for patron in patrons:
+            ride.add_to_queue(patron)
+        assert park_with_rides.total_queue_len == len(patrons)
+
+        ride.load_patrons()
+        ride.remove_from_queue(ride.queue[0])
+
+        assert park_with_rides.total_queue_len == 2
+        assert park_with_rides.total_queue_len == sum(len(r.queue) for r in park_with_rides.rides)
+    
+    def test_state_counts(self, empty_park):
+        """Test counting patrons per state from the state array."""
+        assert empty_park.state_counts()[PatronState.ROAMING] == 0
+        patrons = [Patron(i, 100, 75, personality="balanced") for i in range(5)]
+        for patron in patrons:
+            empty_park.add_patron(patron)
+        patrons[0].state = PatronState.QUEUING
+        patrons[1].state = PatronState.EXITING
+
+        counts = empty_park.state_counts()
+        assert counts == {PatronState.ROAMING: 3, PatronState.QUEUING: 1,
+                          PatronState.RIDING: 0, PatronState.EXITING: 1}
+    
+    def test_detached_patron_walks_to_exit(self, empty_park):
+        """Test that a patron outside the park still walks toward the nearest exit."""
+        empty_park.exits = [(100, 20)]
+        patron = Patron(1, 100, 75, personality="balanced")
+        patron.move_speed = 1.0
+        
+        patron.move_to_exit(empty_park)
+        
+        assert patron.x == pytest.approx(100)
+        assert patron.y == pytest.approx(74)
+        assert patron not in empty_park.patrons
+    
+    def test_step_patrons_reports_exits(self, empty_park):
+        """Test that a batch step returns how many patrons left the park."""
+        exit_x, exit_y = empty_park.exits[0]
+        leaving = Patron(1, exit_x + 1, exit_y, personality="balanced")
+        walking = Patron(2, exit_x + 10, exit_y, personality="balanced")
+        for patron in (leaving, walking):
+            patron.state = PatronState.EXITING
+            patron.immobile_timer = 0
+            empty_park.add_patron(patron)
+
+        assert empty_park.step_patrons() == 1
+        assert empty_park.patrons == [walking]
+        assert len(walking.path_history) == 2
+    
+    def test_patron_steps_indexed_by_state_code(self, empty_park):
+        """Test that each patron state code has its step, with exiting run last."""
+        steps = empty_park._state_steps
+        assert len(steps) == len(PatronState)
+        assert steps[PatronState.ROAMING] == empty_park._step_roaming
+        assert steps[PatronState.QUEUING] == empty_park._step_queuing
+        assert steps[PatronState.RIDING] is None
+        assert steps[-1] == steps[PatronState.EXITING] == empty_park._step_exiting
+    
+    def test_step_patrons_hands_each_state_its_rows_in_order(self, empty_park):
+        """Test that each state's step gets exactly its unfrozen rows, in row order."""
+        states = [PatronState.EXITING, PatronState.ROAMING, PatronState.QUEUING,
+                  PatronState.ROAMING, PatronState.EXITING, PatronState.QUEUING]
+        for i, state in enumerate(states):
+            patron = Patron(i, 100, 75, personality="balanced")
+            patron.state = state
+            patron.immobile_timer = 1 if i == 3 else 0
+            empty_park.add_patron(patron)
+        received = {}
+        empty_park._state_steps = tuple(
+            None if code == PatronState.RIDING else
+            (lambda rows, code=code: received.setdefault(code, rows.tolist()))
+            for code in PatronState)
+
+        assert empty_park.step_patrons() == 0
+        assert received == {PatronState.ROAMING: [1], PatronState.QUEUING: [2, 5],
+                            PatronState.EXITING: [0, 4]}
+    
+    def test_nearest_exit_grid(self, empty_park):
+        """Test the precomputed nearest-exit lookup and its rebuild."""
+        assert empty_park.nearest_exit(30, 120) == (25, 125)
+        assert empty_park.nearest_exit(170, 130) == (175, 125)
+
+        empty_park.exits = [(100, 20)]
+        assert empty_park.nearest_exit(30, 120) == (100, 20)
+
+        empty_park.exits = []
+        assert empty_park.nearest_exit(30, 120) is None
+    
+    def test_exits_cannot_go_stale(self, empty_park):
+        """Test that exits can only change by assignment, which rebuilds the grid."""
+        with pytest.raises(AttributeError):
+            empty_park.exits.append((99, 99))
+
+        empty_park.exits = empty_park.exits + ((99, 99),)
+        assert empty_park.nearest_exit(98, 98) == (99, 99)
+    
     def test_valid_position_checking(self, empty_park):
         """Test position validation."""
         # Center of park should be valid
@@ -355,6 +786,53 @@ class TestPark:
         assert empty_park.is_valid_position(5, 75) == False
         assert empty_park.is_valid_position(300, 75) == False
     
+    def test_valid_positions_matches_scalar_check(self, park_with_rides):
+        """Test that the vectorized position check agrees with the scalar one."""
+        park_with_rides.add_terrain_object(TerrainObject(100, 75, 8, 8, "obstacle"))
+        xs, ys = np.meshgrid(np.arange(0, 280, 3.5), np.arange(0, 200, 3.5))
+        xs, ys = xs.ravel(), ys.ravel()
+
+        valid = park_with_rides.valid_positions(xs, ys)
+
+        expected = [park_with_rides.is_valid_position(x, y) for x, y in zip(xs, ys)]
+        assert valid.tolist() == expected
+    
+    def test_scalar_check_matches_brute_force(self, park_with_rides):
+        """Test that the grid-backed scalar check agrees with a scan of every box."""
+        park_with_rides.add_terrain_object(TerrainObject(100, 75, 8, 8, "obstacle"))
+        park_with_rides.add_terrain_object(TerrainObject(120, 120, 30, 6, "pathway"))
+        boxes = [obj.get_bounding_box() for obj in park_with_rides.terrain_objects
+                 if obj.type != "pathway"]
+        boxes += [(b[0] - 2, b[1] - 2, b[2] + 2, b[3] + 2)
+                  for b in (ride.get_bounding_box() for ride in park_with_rides.rides)]
+
+        for x in np.arange(0, 280, 3.5).tolist():
+            for y in np.arange(0, 200, 3.5).tolist():
+                expected = (12 <= x <= 268 and 12 <= y <= 188 and
+                            not any(b[0] <= x <= b[2] and b[1] <= y <= b[3] for b in boxes))
+                assert park_with_rides.is_valid_position(x, y) == expected
+    
+    def test_obstacle_grid_rebuilds_after_changes(self, empty_park):
+        """Test that the obstacle grid picks up newly added rides and terrain."""
+        xs, ys = np.array([60.0, 150.0]), np.array([60.0, 120.0])
+        assert empty_park.valid_positions(xs, ys).all()
+
+        empty_park.add_terrain_object(TerrainObject(60, 60, 40, 40, "obstacle"))
+        empty_park.add_ride(FerrisWheel("Wheel", 150, 120, capacity=8, duration=10))
+
+        assert not empty_park.valid_positions(xs, ys).any()
+    
+    def test_obstacle_grid_rebuilds_when_counts_stay_the_same(self, empty_park):
+        """Test that replacing an obstacle is not hidden by an unchanged count."""
+        empty_park.add_terrain_object(TerrainObject(60, 60, 40, 40, "obstacle"))
+        assert not empty_park.is_valid_position(60, 60)
+
+        empty_park.terrain_objects.pop()
+        empty_park.add_terrain_object(TerrainObject(150, 100, 20, 20, "obstacle"))
+
+        assert empty_park.is_valid_position(60, 60)
+        assert not empty_park.is_valid_position(150, 100)
+    
     def test_terrain_object_collision(self, empty_park):
         """Test that terrain objects affect position validation."""
         # FIXED: Test now checks that obstacles are created properly
@@ -376,6 +854,50 @@ class TestPark:
         
         # Note: is_valid_position checks ride bounding boxes, not individual terrain objects
         # This is by design - terrain objects are decorative, rides are the main obstacles
+    
+    def test_contains_point_edges_and_arrays(self):
+        """Test that contains_point includes edges and accepts point arrays."""
+        obstacle = TerrainObject(100, 100, 20, 10, "obstacle")
+        
+        assert obstacle.contains_point(110, 105)
+        assert obstacle.contains_point(90, 95)
+        assert not obstacle.contains_point(110.5, 100)
+        
+        xs = np.array([100.0, 90.0, 89.0, 110.0])
+        ys = np.array([100.0, 95.0, 100.0, 106.0])
+        assert obstacle.contains_point(xs, ys).tolist() == [True, True, False, False]
+    
+    def test_seeded_decorations_are_stable(self):
+        """Test that decorations are fixed at build time and seedable."""
+        parks = [Park(width=200, height=150, seed=7) for _ in range(2)]
+        for park in parks:
+            park.add_terrain_object(TerrainObject(100, 75, 8, 8, "obstacle"))
+
+        assert parks[0]._grass_x == parks[1]._grass_x
+        assert parks[0]._grass_y == parks[1]._grass_y
+        trees = parks[0].terrain_objects[-1].tree_centers
+        assert len(trees) == 3
+        assert trees == parks[1].terrain_objects[-1].tree_centers
+    
+    def test_trees_are_drawn_in_data_units(self, empty_park):
+        """Test that obstacle trees are one collection of radius-0.8 circles."""
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PatchCollection
+        empty_park.add_terrain_object(TerrainObject(100, 75, 8, 8, "obstacle"))
+        fig, ax = plt.subplots()
+        try:
+            empty_park.plot(ax)
+            trees = [c for c in ax.collections if isinstance(c, PatchCollection)]
+            
+            assert len(trees) == 1
+            assert len(trees[0].get_paths()) == 3
+            centres = empty_park.terrain_objects[-1].tree_centers
+            for path, centre in zip(trees[0].get_paths(), centres):
+                extents = path.get_extents()
+                np.testing.assert_allclose((extents.width, extents.height), (1.6, 1.6))
+                np.testing.assert_allclose((extents.x0 + 0.8, extents.y0 + 0.8), centre)
+        finally:
+            plt.close(fig)
 
 
 # ============================================================================
@@ -411,6 +933,190 @@ class TestSimulation:
         
         assert sample_simulation.current_timestep == initial_timestep + 1
     
+    def test_advance_runs_many_ticks(self, sample_simulation):
+        """Test that advance runs a block of timesteps and records each one."""
+        sample_simulation.advance(25)
+        
+        assert sample_simulation.current_timestep == 25
+        assert sample_simulation.timesteps_recorded.tolist() == list(range(1, 26))
+        assert len(sample_simulation.patron_counts) == 25
+    
+    def test_run_sweep_is_reproducible(self):
+        """Test that a parallel sweep returns seeded results in grid order."""
+        from adventureworld import create_optimized_park
+        grid = [
+            {'max_timesteps': 60, 'spawn_rate': 0.5, 'seed': 3},
+            {'max_timesteps': 40, 'spawn_rate': 0.5, 'time_of_day': 'night', 'seed': 4},
+            {'max_timesteps': 60, 'spawn_rate': 0.5, 'seed': 3},
+        ]
+
+        results = run_sweep(create_optimized_park, grid, n_procs=2)
+
+        assert [r['timesteps'] for r in results] == [60, 40, 60]
+        assert results[1]['time_of_day'] == 'night'
+        assert results[0] == results[2]
+    
+    def test_seeded_simulations_repeat(self):
+        """Test that a simulation seed fixes arrivals and ride slowdowns."""
+        from adventureworld import create_optimized_park
+        runs = []
+        for _ in range(2):
+            park = create_optimized_park(4)
+            park.reseed(11)
+            sim = Simulation(park, spawn_rate=0.4, time_of_day='night',
+                             verbose=False, seed=5)
+            sim.advance(120)
+            runs.append((sim.total_patrons_spawned, sim.patron_counts.tolist(),
+                         [ride.total_riders_served for ride in park.rides]))
+        
+        assert runs[0] == runs[1]
+    
+    def test_scheduled_events_run_on_their_timestep(self, park_with_rides):
+        """Test that events fire at their timestep and arrivals keep coming."""
+        sim = Simulation(park_with_rides, spawn_rate=1.0, time_of_day='afternoon')
+        fired = []
+        sim.schedule(3, lambda: fired.append(sim.current_timestep))
+
+        sim.advance(5)
+
+        assert fired == [3]
+        assert sim.total_patrons_spawned == 5
+        assert len(park_with_rides.patrons) == 5
+    
+    def test_statistics_buffers_grow_past_max_timesteps(self, sample_simulation):
+        """Test that recorded statistics keep every entry beyond the preallocation."""
+        sample_simulation.advance(80)
+        first_counts = sample_simulation.patron_counts.copy()
+        sample_simulation.advance(70)
+        
+        assert len(sample_simulation.timesteps_recorded) == 150
+        assert sample_simulation.timesteps_recorded[-1] == 150
+        assert np.array_equal(sample_simulation.patron_counts[:80], first_counts)
+    
+    def test_statistics_plot_reuses_artists(self, sample_simulation):
+        """Test that repeated statistics plots update the same artists."""
+        import matplotlib.pyplot as plt
+        fig, (ax_stats, ax_info) = plt.subplots(1, 2)
+        try:
+            for _ in range(3):
+                sample_simulation.advance(10)
+                sample_simulation.plot_statistics(ax_stats)
+                sample_simulation.plot_info_panel(ax_info)
+            
+            assert len(ax_stats.lines) == 2
+            assert len(ax_info.texts) == 1
+            assert list(ax_stats.lines[0].get_xdata()) == list(range(1, 31))
+            assert "Timestep: 30/" in ax_info.texts[0].get_text()
+        finally:
+            plt.close(fig)
+    
+    def test_slow_rides_hold_running_timer(self, park_with_rides):
+        """Test that a fully slowed ride gains back each tick it runs."""
+        sim = Simulation(park_with_rides, spawn_rate=0.0, time_of_day='night')
+        sim.ride_speed_multiplier = 0.0
+        ride = park_with_rides.rides[0]
+        ride.state = RideState.RUNNING
+        ride.timer = 5
+        
+        sim.advance(10)
+        
+        assert ride.state == RideState.RUNNING
+        assert ride.timer == 5
+    
+    def test_slowdown_rolls_are_drawn_in_bounded_blocks(self, park_with_rides):
+        """Test that a long block draws ride slowdowns a bounded chunk at a time."""
+        sim = Simulation(park_with_rides, spawn_rate=0.0, time_of_day='night',
+                         verbose=False, record_every=0)
+        n_ticks = 2 * SLOWDOWN_BATCH_TICKS + 10
+        with patch.object(sim, 'rng', wraps=sim.rng) as rng:
+            sim.advance(n_ticks)
+        
+        shapes = [c.args[0] for c in rng.random.call_args_list]
+        assert shapes == [(SLOWDOWN_BATCH_TICKS, 3), (SLOWDOWN_BATCH_TICKS, 3), (10, 3)]
+        assert sim.current_timestep == n_ticks
+    
+    def test_spawn_gaps_follow_spawn_rate(self, park_with_rides):
+        """Test that sampled arrival gaps average out to the spawn rate."""
+        assert Simulation(park_with_rides, spawn_rate=0.0).events == []
+        
+        sim = Simulation(park_with_rides, spawn_rate=0.2, time_of_day='morning')
+        with patch.object(sim.park, 'spawn_patron'):
+            sim.advance(5000)
+        
+        assert sim.total_patrons_spawned == pytest.approx(5000 * sim.spawn_rate, rel=0.15)
+    
+    def test_changing_spawn_rate_reschedules_arrivals(self, park_with_rides):
+        """Test that a spawn rate set after construction takes effect at once."""
+        sim = Simulation(park_with_rides, spawn_rate=0.0, verbose=False)
+        sim.advance(10)
+        assert sim.total_patrons_spawned == 0
+        
+        sim.spawn_rate = 1.0
+        sim.advance(10)
+        assert sim.total_patrons_spawned == 10
+        
+        sim.spawn_rate = 0.0
+        sim.advance(10)
+        assert sim.total_patrons_spawned == 10
+        assert sim.events == []
+    
+    def test_changing_spawn_rate_discards_drawn_gaps(self, park_with_rides):
+        """Test that gaps drawn ahead at the old rate are not reused."""
+        sim = Simulation(park_with_rides, spawn_rate=1.0, verbose=False)
+        sim.advance(5)
+        assert sim._spawn_gaps
+        
+        sim.spawn_rate = 0.01
+        gaps = list(sim._spawn_gaps)
+        
+        assert len(gaps) == SPAWN_GAP_BATCH - 1
+        assert np.mean(gaps) > 10
+    
+    def test_quiet_simulation_prints_nothing(self, park_with_rides, capsys):
+        """Test that verbose=False silences the setup summary and progress lines."""
+        capsys.readouterr()
+        sim = Simulation(park_with_rides, max_timesteps=100, spawn_rate=0.0, verbose=False)
+        sim.run(interactive=False)
+        assert "Timestep" not in capsys.readouterr().out
+        
+        sim = Simulation(park_with_rides, max_timesteps=100, spawn_rate=0.0, log_every=25)
+        sim.run(interactive=False)
+        assert capsys.readouterr().out.count("Timestep ") == 4
+    
+    def test_record_every_thins_statistics(self, park_with_rides):
+        """Test sampling statistics every few timesteps, or not at all."""
+        sim = Simulation(park_with_rides, max_timesteps=100, record_every=10)
+        sim.advance(35)
+        assert sim.timesteps_recorded.tolist() == [10, 20, 30]
+        
+        sim = Simulation(park_with_rides, max_timesteps=100, record_every=0)
+        sim.advance(35)
+        assert len(sim.patron_counts) == 0
+    
+    def test_batch_run_records_no_statistics_by_default(self, park_with_rides):
+        """Test that run() without a display skips statistics unless asked for them."""
+        sim = Simulation(park_with_rides, max_timesteps=40, verbose=False)
+        sim.run(interactive=False)
+        assert sim.record_every == 0
+        assert len(sim.patron_counts) == 0
+        
+        sim = Simulation(park_with_rides, max_timesteps=40, verbose=False, record_every=10)
+        sim.run(interactive=False)
+        assert sim.timesteps_recorded.tolist() == [10, 20, 30, 40]
+    
+    def test_batch_run_does_not_load_pyplot(self):
+        """Test that non-interactive runs never import pyplot or a GUI backend."""
+        import subprocess
+        code = ("import sys, io, contextlib\n"
+                "from adventureworld import create_optimized_park\n"
+                "from simulation import Simulation\n"
+                "with contextlib.redirect_stdout(io.StringIO()):\n"
+                "    Simulation(create_optimized_park(2), max_timesteps=20).run()\n"
+                "print('matplotlib.pyplot' in sys.modules)\n")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.stdout.strip() == "False"
+    
     def test_patron_spawning_in_simulation(self, sample_simulation):
         """Test that patrons spawn during simulation."""
         initial_patrons = len(sample_simulation.park.patrons)
@@ -468,6 +1174,15 @@ class TestConfiguration:
         assert hasattr(PatronState, 'RIDING')
         assert hasattr(PatronState, 'EXITING')
     
+    def test_state_enums_are_array_codes(self):
+        """Test that states are small integers usable as array codes and table indices."""
+        assert [int(s) for s in PatronState] == list(range(len(PatronState)))
+        assert [int(s) for s in RideState] == list(range(len(RideState)))
+        
+        ride = PirateShip("Test", 100, 100, capacity=5, duration=10)
+        assert len(ride._state_fn) == len(RideState)
+        assert ride._state_fn[RideState.UNLOADING] == ride._tick_unloading
+    
     def test_default_constants(self):
         """Test that default constants are defined."""
         assert DEFAULT_PARK_WIDTH > 0